@@ -2,16 +2,415 @@
 Financial Modeling Prep API client
 """
 import os
+import time
+import random
+import asyncio
+import functools
 import httpx
-from typing import Dict, Any, Optional
+import orjson
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 
 # FMP API Base URL
 FMP_BASE_URL = "https://financialmodelingprep.com/stable"
 
+# Connection limits for the shared client. HTTP/2 multiplexes concurrent requests
+# (e.g. the asyncio.gather fan-outs in the tools) over a single TCP connection,
+# which is kept alive between tool calls that are a few seconds apart.
+FMP_CLIENT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+
+# Timeout (in seconds) for FMP requests; connecting fails faster than reading
+FMP_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+# Maximum number of requests sent to FMP at once; fan-outs such as fetch() queue
+# behind this limit instead of tripping the API rate limit with bursts of 429s
+FMP_MAX_CONCURRENCY = int(os.environ.get("FMP_MAX_CONCURRENCY", "6"))
+
+# Transient HTTP statuses that are retried, up to FMP_MAX_RETRIES times, with
+# exponential backoff (FMP_RETRY_BACKOFF ** attempt seconds plus jitter) or the
+# server's Retry-After, capped at FMP_RETRY_MAX_DELAY seconds
+FMP_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+FMP_MAX_RETRIES = 3
+FMP_RETRY_BACKOFF = 1.5
+FMP_RETRY_MAX_DELAY = 10.0
+
+# Cache TTLs (in seconds) per endpoint. Responses from endpoints not listed here
+# are never cached; entries are only invalidated by TTL expiry.
+FMP_CACHE_TTLS = {
+    "quote": 15,
+    "aftermarket-quote": 15,
+    "biggest-gainers": 60,
+    "biggest-losers": 60,
+    "most-actives": 60,
+    "stock-price-change": 300,
+    "rsi": 300,
+    "macd": 300,
+    "bbands": 300,
+    "stoch": 300,
+    "stock_news": 900,
+    "exchange-market-hours": 60,
+    "historical-price-full": 3600,
+    "search-symbol": 3600,
+    "search-name": 3600,
+    "index-list": 86400,
+    "forex-list": 86400,
+    "cryptocurrency-list": 86400,
+    "commodities-list": 86400,
+    "profile": 86400,
+    "rating": 86400,
+    "income-statement": 86400,
+    "balance-sheet-statement": 86400,
+    "cash-flow-statement": 86400,
+    "ratios": 86400,
+    "insider-trading": 86400,
+    "institutional-holder": 86400,
+    "short-interest": 86400,
+}
+
+# Shorter TTLs (in seconds) for empty responses, so repeated lookups of mistyped
+# symbols or names are answered from the cache too. Error responses are never cached.
+FMP_NEGATIVE_CACHE_TTLS = {
+    "search-symbol": 300,
+    "search-name": 300,
+}
+
+# Maximum number of cached responses before the least recently used is evicted
+FMP_CACHE_MAX_SIZE = 4096
+
+# Version prefix of every cache key; bump it to invalidate all cached responses
+FMP_CACHE_VERSION = "v1"
+
+# Response cache mapping a request key to (expiry time, response data)
+_cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+
+# Endpoints whose responses rarely change. Their ETag/Last-Modified validators are
+# kept, so once the cache entry expires the response is revalidated with a
+# conditional GET; an unchanged response comes back as a bodiless 304.
+FMP_CONDITIONAL_ENDPOINTS = frozenset({"profile", "stock-price-change", "search-symbol", "search-name"})
+
+# Validators per request, mapping (url, params) to (ETag, Last-Modified, response
+# data), bounded by FMP_CACHE_MAX_SIZE like the response cache
+_validators: "OrderedDict[Tuple, Tuple[Optional[str], Optional[str], Any]]" = OrderedDict()
+
+# Single-symbol quote requests arriving within this window (in seconds) are
+# combined into one batch-quote request of at most FMP_QUOTE_BATCH_SIZE symbols
+FMP_QUOTE_BATCH_WINDOW = 0.01
+FMP_QUOTE_BATCH_SIZE = 50
+
+# Errors from batch-quote meaning the API key cannot use it (e.g. the endpoint is not
+# on its plan); quotes for such a key are no longer batched
+FMP_BATCH_UNAVAILABLE_ERRORS = frozenset(f"HTTP error: {status}" for status in (401, 402, 403))
+
+# Quote batches currently collecting symbols, keyed by API key
+_quote_batches: Dict[str, list] = {}
+
+# API keys whose batch-quote request failed with one of FMP_BATCH_UNAVAILABLE_ERRORS
+_batch_quote_unavailable: set = set()
+
+# Requests currently in flight, so identical concurrent requests share one response
+_inflight: Dict[Tuple, "asyncio.Task[Any]"] = {}
+
+# Shared client, created lazily and bound to the event loop it was created on,
+# with the semaphore limiting its concurrent requests to FMP_MAX_CONCURRENCY
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_request_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client, creating it if needed
+    
+    Connections are pooled per event loop, so a new client is created when
+    called from a different loop than the one the current client belongs to.
+    
+    Returns:
+        Shared httpx.AsyncClient instance
+    """
+    global _client, _client_loop, _request_slots
+    
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(http2=True, limits=FMP_CLIENT_LIMITS, timeout=FMP_TIMEOUT)
+        _client_loop = loop
+        _request_slots = asyncio.Semaphore(FMP_MAX_CONCURRENCY)
+    return _client
+
+
+def _cache_get(key: Tuple) -> Optional[Any]:
+    """
+    Look up a cached response
+    
+    Args:
+        key: Cache key built from the cache version, endpoint, params and API key
+        
+    Returns:
+        Cached response data, or None if missing or expired
+    """
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    
+    expires_at, data = entry
+    if expires_at <= time.monotonic():
+        del _cache[key]
+        return None
+    
+    _cache.move_to_end(key)
+    return data
+
+
+def _cache_set(key: Tuple, data: Any, ttl: float) -> None:
+    """
+    Store a response in the cache, evicting the least recently used entries when full
+    
+    Args:
+        key: Cache key built from the cache version, endpoint, params and API key
+        data: Response data to cache
+        ttl: Time to live in seconds
+    """
+    _cache[key] = (time.monotonic() + ttl, data)
+    _cache.move_to_end(key)
+    while len(_cache) > FMP_CACHE_MAX_SIZE:
+        _cache.popitem(last=False)
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """
+    Get how long to wait before retrying a rate-limited or failed request
+    
+    Args:
+        response: Response with a retryable status
+        attempt: Number of the attempt that failed, starting at 0
+        
+    Returns:
+        Delay in seconds, from the Retry-After header if present, else exponential backoff with jitter
+    """
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return min(max(float(retry_after), 0.0), FMP_RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    return min(FMP_RETRY_BACKOFF ** attempt + random.random(), FMP_RETRY_MAX_DELAY)
+
+
+def _conditional_headers(entry: Optional[Tuple[Optional[str], Optional[str], Any]]) -> Dict[str, str]:
+    """
+    Build the conditional request headers for a previously seen response
+    
+    Args:
+        entry: Stored (ETag, Last-Modified, response data), or None
+        
+    Returns:
+        If-None-Match/If-Modified-Since headers, empty if there is nothing to revalidate
+    """
+    headers = {}
+    if entry is not None:
+        etag, last_modified, _ = entry
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def _store_validators(key: Tuple, response: httpx.Response, data: Any) -> None:
+    """
+    Remember the validators of a full response so it can be revalidated later
+    
+    Args:
+        key: Validator key built from the URL and query parameters
+        response: Successful (200) response
+        data: Parsed response data
+    """
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not (etag or last_modified) or not data or (isinstance(data, dict) and "error" in data):
+        return
+    
+    _validators[key] = (etag, last_modified, data)
+    _validators.move_to_end(key)
+    while len(_validators) > FMP_CACHE_MAX_SIZE:
+        _validators.popitem(last=False)
+
+
+async def _get(url: str, params: Dict, revalidate: bool = False) -> Any:
+    """
+    Perform a GET request against the FMP API
+    
+    Responses with a status in FMP_RETRY_STATUSES are retried with backoff. At
+    most FMP_MAX_CONCURRENCY requests are sent at once; the rest wait their turn.
+    
+    Args:
+        url: Full request URL
+        params: Query parameters, including the API key
+        revalidate: Whether to keep the response validators and send a conditional
+                    GET when a previous response for the same request is known
+        
+    Returns:
+        JSON response data or error information
+    """
+    validator_key = (url, tuple(sorted(params.items()))) if revalidate else None
+    
+    for attempt in range(FMP_MAX_RETRIES + 1):
+        try:
+            client = _get_client()
+            entry = _validators.get(validator_key) if validator_key is not None else None
+            headers = _conditional_headers(entry)
+            async with _request_slots:
+                if headers:
+                    response = await client.get(url, params=params, headers=headers)
+                else:
+                    response = await client.get(url, params=params)
+            if headers and response.status_code == 304:
+                # Unchanged since the stored response; reuse its data
+                _validators[validator_key] = entry
+                _validators.move_to_end(validator_key)
+                return entry[2]
+            response.raise_for_status()  # Remove await here, httpx Response.raise_for_status() is not a coroutine
+            data = orjson.loads(response.content)
+            if validator_key is not None and response.status_code == 200:
+                _store_validators(validator_key, response, data)
+            return data
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in FMP_RETRY_STATUSES and attempt < FMP_MAX_RETRIES:
+                await asyncio.sleep(_retry_delay(e.response, attempt))
+                continue
+            return {"error": f"HTTP error: {e.response.status_code}", "message": str(e)}
+        except httpx.RequestError as e:
+            return {"error": "Request error", "message": str(e)}
+        except Exception as e:
+            return {"error": "Unknown error", "message": str(e)}
+
+
+async def _get_batched_quote(symbol: str, api_key: str) -> Any:
+    """
+    Get a single-symbol quote, batching it with other concurrent quote requests
+    
+    The first request in a window waits FMP_QUOTE_BATCH_WINDOW seconds for others
+    to join, then fetches all collected symbols with one batch-quote request and
+    hands each waiter its own slice. That wait is added to every quote that starts
+    a window, including a lone one. If the batch request fails, leaves a symbol
+    out, or the first request is cancelled, the affected symbols are fetched
+    individually. Once batch-quote is refused for an API key (e.g. the endpoint is
+    not on its plan), that key's quotes are fetched individually without waiting.
+    
+    Args:
+        symbol: Ticker symbol to quote
+        api_key: API key for authentication
+        
+    Returns:
+        Quote response data for the symbol, in the same shape as the quote endpoint
+    """
+    if api_key in _batch_quote_unavailable:
+        return await _get(f"{FMP_BASE_URL}/quote", {"symbol": symbol, "apikey": api_key})
+    
+    batch = _quote_batches.get(api_key)
+    if batch is not None and len(batch) < FMP_QUOTE_BATCH_SIZE:
+        # Join the batch that is currently collecting symbols
+        future = asyncio.get_running_loop().create_future()
+        batch.append((symbol, future))
+        data = await future
+        if data is None:
+            data = await _get(f"{FMP_BASE_URL}/quote", {"symbol": symbol, "apikey": api_key})
+        return data
+    
+    # Start a new batch and collect symbols until the window closes
+    batch = [(symbol, None)]
+    _quote_batches[api_key] = batch
+    results: Dict[str, Any] = {}
+    try:
+        try:
+            await asyncio.sleep(FMP_QUOTE_BATCH_WINDOW)
+        finally:
+            if _quote_batches.get(api_key) is batch:
+                del _quote_batches[api_key]
+        
+        symbols = list(dict.fromkeys(entry[0] for entry in batch))
+        if len(symbols) > 1:
+            data = await _get(f"{FMP_BASE_URL}/batch-quote", {"symbols": ",".join(symbols), "apikey": api_key})
+            if isinstance(data, list):
+                quotes: Dict[str, list] = {}
+                for quote in data:
+                    quotes.setdefault(str(quote.get("symbol", "")).upper(), []).append(quote)
+                results = {s: quotes[s.upper()] for s in symbols if s.upper() in quotes}
+            elif isinstance(data, dict) and data.get("error") in FMP_BATCH_UNAVAILABLE_ERRORS:
+                _batch_quote_unavailable.add(api_key)
+    finally:
+        # Waiters without a batch result (single symbol, symbol missing from the
+        # batch, failed batch or cancelled leader) fetch on their own
+        for batch_symbol, future in batch[1:]:
+            if not future.done():
+                future.set_result(results.get(batch_symbol))
+    
+    if symbol in results:
+        return results[symbol]
+    return await _get(f"{FMP_BASE_URL}/quote", {"symbol": symbol, "apikey": api_key})
+
+
+def _forget_request(request_key: Tuple, task: "asyncio.Task[Any]") -> None:
+    """Drop a finished request task, retrieving its exception so it is never reported as unhandled"""
+    if _inflight.get(request_key) is task:
+        del _inflight[request_key]
+    if not task.cancelled():
+        task.exception()
+
+
+async def _request(endpoint: str, url: str, params: Dict, api_key: str, request_key: Tuple, ttl: Optional[int]) -> Any:
+    """
+    Perform a request for fmp_api_request and cache its response
+    
+    Args:
+        endpoint: API endpoint path (without the base URL)
+        url: Full request URL
+        params: Query parameters, including the API key
+        api_key: API key for authentication
+        request_key: Cache key of the request
+        ttl: Cache TTL of the endpoint in seconds, or None if it is not cached
+        
+    Returns:
+        JSON response data or error information
+    """
+    symbol = params.get("symbol")
+    if endpoint == "quote" and len(params) == 2 and isinstance(symbol, str) and "," not in symbol:
+        data = await _get_batched_quote(symbol, api_key)
+    else:
+        data = await _get(url, params, revalidate=endpoint in FMP_CONDITIONAL_ENDPOINTS)
+    
+    # Cache non-empty, non-error responses, and empty ones where a negative TTL is set
+    if ttl is not None and data and not (isinstance(data, dict) and "error" in data):
+        _cache_set(request_key, data, ttl)
+    elif data == [] and endpoint in FMP_NEGATIVE_CACHE_TTLS:
+        _cache_set(request_key, data, FMP_NEGATIVE_CACHE_TTLS[endpoint])
+    
+    return data
+
+
+async def close_client() -> None:
+    """
+    Close the shared HTTP client and release its pooled connections
+    
+    Called on server shutdown; the next request after this creates a new client.
+    """
+    global _client, _client_loop, _request_slots
+    
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+    _request_slots = None
+
+
 async def fmp_api_request(endpoint: str, params: Dict = None, api_key: str = None) -> Dict:
     """
     Make a request to the Financial Modeling Prep API
     
+    Responses from endpoints listed in FMP_CACHE_TTLS are cached, identical
+    requests made while one is already in flight wait for that response instead
+    of issuing their own, and concurrent single-symbol quotes are batched.
+    Endpoints in FMP_CONDITIONAL_ENDPOINTS are revalidated with conditional GETs.
+    
     Args:
         endpoint: API endpoint path (without the base URL)
         params: Query parameters for the request
@@ -30,16 +429,22 @@ async def fmp_api_request(endpoint: str, params: Dict = None, api_key: str = Non
     if api_key is None:
         api_key = os.environ.get("FMP_API_KEY", "demo")
     
-    params["apikey"] = api_key
+    request_key = (FMP_CACHE_VERSION, endpoint, tuple(sorted(params.items())), api_key)
     
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, timeout=30.0)
-            response.raise_for_status()  # Remove await here, httpx Response.raise_for_status() is not a coroutine
-            return response.json()  # Remove await here, httpx Response.json() is not a coroutine
-    except httpx.HTTPStatusError as e:
-        return {"error": f"HTTP error: {e.response.status_code}", "message": str(e)}
-    except httpx.RequestError as e:
-        return {"error": "Request error", "message": str(e)}
-    except Exception as e:
-        return {"error": "Unknown error", "message": str(e)}
\ No newline at end of file
+    # Serve cacheable endpoints from the cache while the entry is fresh
+    ttl = FMP_CACHE_TTLS.get(endpoint)
+    if ttl is not None or endpoint in FMP_NEGATIVE_CACHE_TTLS:
+        cached = _cache_get(request_key)
+        if cached is not None:
+            return cached
+    
+    # Join an identical request that is already in flight, or start one. The
+    # request runs in its own task, so cancelling any caller (including the one
+    # that started it) cancels neither the request nor the other callers.
+    task = _inflight.get(request_key)
+    if task is None:
+        params["apikey"] = api_key
+        task = asyncio.ensure_future(_request(endpoint, url, params, api_key, request_key, ttl))
+        _inflight[request_key] = task
+        task.add_done_callback(functools.partial(_forget_request, request_key))
+    return await asyncio.shield(task)
@@ -2,6 +2,7 @@
 Market-related resources for the FMP MCP server
 """
 import json
+import asyncio
 from datetime import datetime
 from typing import Dict, Any, Optional
 
@@ -15,13 +16,17 @@ async def get_market_snapshot_resource() -> str:
     Returns:
         JSON formatted market data
     """
-    # Fetch major indexes
-    indexes = ["%5EGSPC", "%5EDJI", "%5EIXIC"]  # S&P 500, Dow Jones, NASDAQ
-    index_data = await fmp_api_request("quote", {"symbol": ",".join(indexes)})
+    # Major indexes: S&P 500, Dow Jones, NASDAQ
+    indexes = ["%5EGSPC", "%5EDJI", "%5EIXIC"]
     
-    # Fetch some sector ETFs
+    # Some sector ETFs
     sectors = ["XLF", "XLK", "XLV", "XLE", "XLU", "XLI", "XLP", "XLY", "XLB", "XLRE"]
-    sector_data = await fmp_api_request("quote", {"symbol": ",".join(sectors)})
+    
+    # Fetch both quote sets concurrently
+    index_data, sector_data = await asyncio.gather(
+        fmp_api_request("quote", {"symbol": ",".join(indexes)}),
+        fmp_api_request("quote", {"symbol": ",".join(sectors)})
+    )
     
     # Map sector tickers to names
     sector_names = {
@@ -17,11 +17,14 @@ env_path = pathlib.Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 from mcp.server.fastmcp import FastMCP, Context
 
+# Import the API client so the shared HTTP client can be closed on shutdown
+from src.api.client import close_client
+
 # Import tools
 from src.tools.company import get_company_profile, get_company_notes
 from src.tools.statements import get_income_statement
-from src.tools.search import search_by_symbol, search_by_name, search, fetch
-from src.tools.quote import get_quote, get_quote_change, get_aftermarket_quote
+from src.tools.search import search_by_symbol, search_by_name, search, fetch, fetch_many
+from src.tools.quote import get_quote, get_quote_change, get_aftermarket_quote, get_multi_asset_quotes
 from src.tools.charts import get_price_change
 from src.tools.analyst import get_ratings_snapshot, get_financial_estimates, get_price_target_news, get_price_target_latest_news
 from src.tools.calendar import get_company_dividends, get_dividends_calendar
@@ -57,12 +60,14 @@ mcp.tool()(get_company_notes)
 mcp.tool()(get_quote)
 mcp.tool()(get_quote_change)
 mcp.tool()(get_aftermarket_quote)
+mcp.tool()(get_multi_asset_quotes)
 mcp.tool()(get_price_change)
 mcp.tool()(get_income_statement)
 mcp.tool()(search_by_symbol)
 mcp.tool()(search_by_name)
 mcp.tool()(search)
 mcp.tool()(fetch)
+mcp.tool()(fetch_many)
 mcp.tool()(get_ratings_snapshot)
 mcp.tool()(get_financial_estimates)
 mcp.tool()(get_price_target_news)
@@ -105,6 +110,27 @@ mcp.prompt()(investment_idea_generation)
 mcp.prompt()(technical_analysis)
 mcp.prompt()(economic_indicator_analysis)
 
+
+def close_client_on_shutdown(app):
+    """
+    Wrap a Starlette app's lifespan so the shared FMP HTTP client is closed on shutdown
+    
+    Args:
+        app: Starlette application served by uvicorn
+    """
+    from contextlib import asynccontextmanager
+    
+    app_lifespan = app.router.lifespan_context
+    
+    @asynccontextmanager
+    async def lifespan(lifespan_app):
+        async with app_lifespan(lifespan_app) as state:
+            yield state
+        await close_client()
+    
+    app.router.lifespan_context = lifespan
+
+
 # Run the server if executed directly
 if __name__ == "__main__":
     import argparse
@@ -145,6 +171,8 @@ if __name__ == "__main__":
             ]
         )
         
+        close_client_on_shutdown(app)
+        
         # Print information message
         print(f"Starting FMP MCP Server (SSE mode) on http://{args.host}:{args.port}")
         print(f"API Key configured: {'Yes' if os.environ.get('FMP_API_KEY') else 'No - using demo mode'}")
@@ -184,8 +212,8 @@ if __name__ == "__main__":
         # Import tools
         from src.tools.company import get_company_profile, get_company_notes
         from src.tools.statements import get_income_statement
-        from src.tools.search import search_by_symbol, search_by_name, search, fetch
-        from src.tools.quote import get_quote, get_quote_change, get_aftermarket_quote
+        from src.tools.search import search_by_symbol, search_by_name, search, fetch, fetch_many
+        from src.tools.quote import get_quote, get_quote_change, get_aftermarket_quote, get_multi_asset_quotes
         from src.tools.charts import get_price_change
         from src.tools.analyst import get_ratings_snapshot, get_financial_estimates, get_price_target_news, get_price_target_latest_news
         from src.tools.calendar import get_company_dividends, get_dividends_calendar
@@ -217,12 +245,14 @@ if __name__ == "__main__":
         streamable_mcp.tool()(get_quote)
         streamable_mcp.tool()(get_quote_change)
         streamable_mcp.tool()(get_aftermarket_quote)
+        streamable_mcp.tool()(get_multi_asset_quotes)
         streamable_mcp.tool()(get_price_change)
         streamable_mcp.tool()(get_income_statement)
         streamable_mcp.tool()(search_by_symbol)
         streamable_mcp.tool()(search_by_name)
         streamable_mcp.tool()(search)
         streamable_mcp.tool()(fetch)
+        streamable_mcp.tool()(fetch_many)
         streamable_mcp.tool()(get_ratings_snapshot)
         streamable_mcp.tool()(get_financial_estimates)
         streamable_mcp.tool()(get_price_target_news)
@@ -271,6 +301,7 @@ if __name__ == "__main__":
         # Insert health check route at the beginning
         health_route = Route("/health", health_check, methods=["GET"])
         app.router.routes.insert(0, health_route)
+        close_client_on_shutdown(app)
         
         # Run the server
         uvicorn.run(app, host=args.host, port=args.port)
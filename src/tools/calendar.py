@@ -11,13 +11,6 @@ from datetime import datetime, timedelta
 from src.api.client import fmp_api_request
 
 
-def format_number(value: Any) -> str:
-    """Format a number with commas, or return as-is if not a number"""
-    if isinstance(value, (int, float)):
-        return f"{value:,}"
-    return str(value)
-
-
 async def get_company_dividends(symbol: str, limit: int = 10) -> str:
     """
     Get dividend history for a specific company
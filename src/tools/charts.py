@@ -4,11 +4,12 @@ Chart-related tools for the FMP MCP server
 This module contains tools related to the Chart section of the Financial Modeling Prep API:
 https://site.financialmodelingprep.com/developer/docs/stable#charts
 """
+import heapq
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 
 from src.api.client import fmp_api_request
-from src.tools.statements import format_number
+from src.tools.statements import format_number, direction_emoji
 
 
 async def get_price_change(symbol: str) -> str:
@@ -40,14 +41,16 @@ async def get_price_change(symbol: str) -> str:
     else:
         return f"No historical price data found for symbol {symbol}"
     
-    # Sort by date (most recent first)
-    historical_entries.sort(key=lambda x: x.get('date', ''), reverse=True)
+    # Only the 22 most recent entries are needed (latest, 1 day, 1 week and 1 month back),
+    # so select them with a partial sort instead of sorting the whole history in place
+    entry_count = len(historical_entries)
+    recent_entries = heapq.nlargest(22, historical_entries, key=lambda x: x.get('date', ''))
     
     # Get the latest price 
-    if not historical_entries:
+    if not recent_entries:
         return f"No historical price data available for {symbol}"
     
-    latest_entry = historical_entries[0]
+    latest_entry = recent_entries[0]
     latest_price = latest_entry.get('close', latest_entry.get('price', None))
     
     if latest_price is None:
@@ -61,33 +64,33 @@ async def get_price_change(symbol: str) -> str:
     result.append("")
     
     # Calculate some basic price changes if we have enough history
-    if len(historical_entries) >= 30:
+    if entry_count >= 30:
         try:
             # 1 day change (if available)
-            if len(historical_entries) >= 2:
-                prev_day = historical_entries[1]
+            if len(recent_entries) >= 2:
+                prev_day = recent_entries[1]
                 prev_price = prev_day.get('close', prev_day.get('price', None))
                 if prev_price:
                     day_change = ((latest_price - prev_price) / prev_price) * 100
-                    emoji = "🔺" if day_change > 0 else "🔻" if day_change < 0 else "➖"
+                    emoji = direction_emoji(day_change)
                     result.append(f"**1 Day Change**: {emoji} {day_change:.2f}%")
             
             # 1 week change (approximately 5 trading days)
-            if len(historical_entries) >= 6:
-                week_entry = historical_entries[5]
+            if len(recent_entries) >= 6:
+                week_entry = recent_entries[5]
                 week_price = week_entry.get('close', week_entry.get('price', None))
                 if week_price:
                     week_change = ((latest_price - week_price) / week_price) * 100
-                    emoji = "🔺" if week_change > 0 else "🔻" if week_change < 0 else "➖"
+                    emoji = direction_emoji(week_change)
                     result.append(f"**1 Week Change**: {emoji} {week_change:.2f}%")
             
             # 1 month change (approximately 21 trading days)
-            if len(historical_entries) >= 22:
-                month_entry = historical_entries[21]
+            if len(recent_entries) >= 22:
+                month_entry = recent_entries[21]
                 month_price = month_entry.get('close', month_entry.get('price', None))
                 if month_price:
                     month_change = ((latest_price - month_price) / month_price) * 100
-                    emoji = "🔺" if month_change > 0 else "🔻" if month_change < 0 else "➖"
+                    emoji = direction_emoji(month_change)
                     result.append(f"**1 Month Change**: {emoji} {month_change:.2f}%")
             
         except (TypeError, ValueError, ZeroDivisionError) as e:
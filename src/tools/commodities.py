@@ -10,7 +10,7 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List, Union
 
 from src.api.client import fmp_api_request
-from src.tools.statements import format_number
+from src.tools.statements import format_number, direction_emoji
 
 
 async def get_commodities_list() -> str:
@@ -107,7 +107,7 @@ async def get_commodities_prices(symbol: str = None) -> str:
         change_percent = commodity.get('changesPercentage', 0)
         
         # Determine change emoji
-        change_emoji = "🔺" if change > 0 else "🔻" if change < 0 else "➖"
+        change_emoji = direction_emoji(change)
         
         # Format the values
         change_str = f"{change_emoji} {format_number(abs(change))}"
@@ -248,7 +248,7 @@ async def get_historical_price_eod_light(
                 daily_change_pct = (daily_change / prev_price) * 100
                 
                 # Determine change emoji
-                change_emoji = "🔺" if daily_change > 0 else "🔻" if daily_change < 0 else "➖"
+                change_emoji = direction_emoji(daily_change)
                 
                 # Format the values
                 daily_change_str = f"{change_emoji} {format_number(abs(daily_change))}"
@@ -9,13 +9,7 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List, Union
 
 from src.api.client import fmp_api_request
-
-# Helper function for formatting numbers with commas
-def format_number(value: Any) -> str:
-    """Format a number with commas, or return as-is if not a number"""
-    if isinstance(value, (int, float)):
-        return f"{value:,}"
-    return str(value)
+from src.tools.statements import format_number
 
 
 async def get_company_profile(symbol: str) -> str:
@@ -9,7 +9,7 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List, Union
 
 from src.api.client import fmp_api_request
-from src.tools.statements import format_number
+from src.tools.statements import format_number, direction_emoji
 
 
 async def get_crypto_list() -> str:
@@ -95,7 +95,7 @@ async def get_crypto_quote(symbol: str = None) -> str:
         change_percent = crypto.get('changesPercentage', 0)
         
         # Determine change emoji
-        change_emoji = "🔺" if change > 0 else "🔻" if change < 0 else "➖"
+        change_emoji = direction_emoji(change)
         
         # Format the values
         change_str = f"{change_emoji} {format_number(abs(change))}"
@@ -9,7 +9,7 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List, Union
 
 from src.api.client import fmp_api_request
-from src.tools.statements import format_number
+from src.tools.statements import format_number, direction_emoji
 
 
 async def get_forex_list() -> str:
@@ -100,7 +100,7 @@ async def get_forex_quotes(symbol: str) -> str:
     change_percent = quote.get('changePercentage', 0)
     
     # Format change with direction emoji
-    change_emoji = "🔺" if change > 0 else "🔻" if change < 0 else "➖"
+    change_emoji = direction_emoji(change)
     change_formatted = f"{change_emoji} {format_number(abs(change))}"
     
     # Format the percentage to 2 decimal places
@@ -9,7 +9,7 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List, Union
 
 from src.api.client import fmp_api_request
-from src.tools.statements import format_number
+from src.tools.statements import format_number, direction_emoji
 
 
 async def get_index_list() -> str:
@@ -77,7 +77,7 @@ async def get_index_quote(symbol: str) -> str:
     # Format the response
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     change_percent = quote.get('changesPercentage', 0)
-    change_emoji = "🔺" if change_percent > 0 else "🔻" if change_percent < 0 else "➖"
+    change_emoji = direction_emoji(change_percent)
     
     # Handle index name - sometimes indices have unusual names in the API response
     name = quote.get('name', 'Unknown Index')
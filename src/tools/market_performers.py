@@ -11,30 +11,69 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List, Union
 
 from src.api.client import fmp_api_request
-from src.tools.statements import format_number
+from src.tools.statements import format_number, direction_emoji, response_error
 
 
-async def get_biggest_gainers(limit: int = 10) -> str:
+def _format_performer_row(rank: int, stock: Dict[str, Any], show_emoji: bool) -> str:
     """
-    Get a list of stocks with the biggest percentage gains
+    Format a single market performers table row
+    
+    Kept as a standalone, fully typed function since it runs once per row and is
+    the CPU hot spot of the performer tools once the network call returns.
     
     Args:
-        limit: Number of gainers to return (1-100)
+        rank: 1-based position of the stock in the table
+        stock: Stock entry from the API response
+        show_emoji: Whether to prefix the change column with a direction emoji
         
     Returns:
-        List of stocks with the highest percentage gains
+        Markdown table row
+    """
+    symbol = stock.get('symbol', 'N/A')
+    name = stock.get('name', 'N/A')
+    price = f"${format_number(stock.get('price', 'N/A'))}"
+    change = stock.get('change', 0)
+    change_percent = stock.get('changesPercentage', 0)
+    if show_emoji:
+        change_emoji = direction_emoji(change_percent)
+        change_str = f"{change_emoji} ${format_number(abs(change))}"
+    else:
+        change_str = f"${format_number(change)}"
+    change_percent_str = f"{change_percent}%"
+    volume = format_number(stock.get('volume', 'N/A'))
+    
+    return f"| {rank} | {symbol} | {name} | {price} | {change_str} | {change_percent_str} | {volume} |"
+
+
+async def _get_market_performers(endpoint: str, title: str, description: str,
+                                 limit: int, show_emoji: bool = False) -> str:
+    """
+    Fetch and format a market performers table
+    
+    The gainers, losers and most active tools share the same endpoint shape and
+    table layout, so they all go through this single implementation.
+    
+    Args:
+        endpoint: API endpoint to query (e.g., "biggest-gainers")
+        title: Table title used in the heading (e.g., "Biggest Gainers")
+        description: Lowercase description used in error messages
+        limit: Number of stocks to return (1-100)
+        show_emoji: Whether to prefix the change column with a direction emoji
+        
+    Returns:
+        Markdown table of the top performers
     """
     # Validate inputs
     if not 1 <= limit <= 100:
         return "Error: limit must be between 1 and 100"
     
-    data = await fmp_api_request("biggest-gainers", {})
-    
-    if isinstance(data, dict) and "error" in data:
-        return f"Error fetching biggest gainers: {data.get('message', 'Unknown error')}"
+    # Ask the API for only the rows we need; the slice below still applies
+    # in case the endpoint ignores the limit parameter
+    data = await fmp_api_request(endpoint, {"limit": limit})
     
-    if not data or not isinstance(data, list) or len(data) == 0:
-        return "No data found for biggest gainers"
+    error = response_error(data, description)
+    if error is not None:
+        return error
     
     # Limit the number of results
     data = data[:limit]
@@ -43,7 +82,7 @@ async def get_biggest_gainers(limit: int = 10) -> str:
     current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     result = [
-        f"# Top {limit} Biggest Gainers",
+        f"# Top {limit} {title}",
         f"*Data as of {current_time}*",
         "",
         "| Rank | Symbol | Company | Price | Change | Change % | Volume |",
@@ -51,21 +90,24 @@ async def get_biggest_gainers(limit: int = 10) -> str:
     ]
     
     # Add stocks to the table
-    for i, stock in enumerate(data, 1):
-        symbol = stock.get('symbol', 'N/A')
-        name = stock.get('name', 'N/A')
-        price = f"${format_number(stock.get('price', 'N/A'))}"
-        change = stock.get('change', 0)
-        change_str = f"${format_number(change)}"
-        change_percent = stock.get('changesPercentage', 0)
-        change_percent_str = f"{change_percent}%"
-        volume = format_number(stock.get('volume', 'N/A'))
-        
-        result.append(f"| {i} | {symbol} | {name} | {price} | {change_str} | {change_percent_str} | {volume} |")
+    result.extend(_format_performer_row(i, stock, show_emoji) for i, stock in enumerate(data, 1))
     
     return "\n".join(result)
 
 
+async def get_biggest_gainers(limit: int = 10) -> str:
+    """
+    Get a list of stocks with the biggest percentage gains
+    
+    Args:
+        limit: Number of gainers to return (1-100)
+        
+    Returns:
+        List of stocks with the highest percentage gains
+    """
+    return await _get_market_performers("biggest-gainers", "Biggest Gainers", "biggest gainers", limit)
+
+
 async def get_biggest_losers(limit: int = 10) -> str:
     """
     Get a list of stocks with the biggest percentage losses
@@ -76,46 +118,7 @@ async def get_biggest_losers(limit: int = 10) -> str:
     Returns:
         List of stocks with the highest percentage drops
     """
-    # Validate inputs
-    if not 1 <= limit <= 100:
-        return "Error: limit must be between 1 and 100"
-    
-    data = await fmp_api_request("biggest-losers", {})
-    
-    if isinstance(data, dict) and "error" in data:
-        return f"Error fetching biggest losers: {data.get('message', 'Unknown error')}"
-    
-    if not data or not isinstance(data, list) or len(data) == 0:
-        return "No data found for biggest losers"
-    
-    # Limit the number of results
-    data = data[:limit]
-    
-    # Format the response
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    result = [
-        f"# Top {limit} Biggest Losers",
-        f"*Data as of {current_time}*",
-        "",
-        "| Rank | Symbol | Company | Price | Change | Change % | Volume |",
-        "|------|--------|---------|-------|--------|----------|--------|"
-    ]
-    
-    # Add stocks to the table
-    for i, stock in enumerate(data, 1):
-        symbol = stock.get('symbol', 'N/A')
-        name = stock.get('name', 'N/A')
-        price = f"${format_number(stock.get('price', 'N/A'))}"
-        change = stock.get('change', 0)
-        change_str = f"${format_number(change)}"
-        change_percent = stock.get('changesPercentage', 0)
-        change_percent_str = f"{change_percent}%"
-        volume = format_number(stock.get('volume', 'N/A'))
-        
-        result.append(f"| {i} | {symbol} | {name} | {price} | {change_str} | {change_percent_str} | {volume} |")
-    
-    return "\n".join(result)
+    return await _get_market_performers("biggest-losers", "Biggest Losers", "biggest losers", limit)
 
 
 async def get_most_active(limit: int = 10) -> str:
@@ -128,46 +131,5 @@ async def get_most_active(limit: int = 10) -> str:
     Returns:
         List of most actively traded stocks
     """
-    # Validate inputs
-    if not 1 <= limit <= 100:
-        return "Error: limit must be between 1 and 100"
-    
-    data = await fmp_api_request("most-actives", {})
-    
-    if isinstance(data, dict) and "error" in data:
-        return f"Error fetching most active stocks: {data.get('message', 'Unknown error')}"
-    
-    if not data or not isinstance(data, list) or len(data) == 0:
-        return "No data found for most active stocks"
-    
-    # Limit the number of results
-    data = data[:limit]
-    
-    # Format the response
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    result = [
-        f"# Top {limit} Most Active Stocks",
-        f"*Data as of {current_time}*",
-        "",
-        "| Rank | Symbol | Company | Price | Change | Change % | Volume |",
-        "|------|--------|---------|-------|--------|----------|--------|"
-    ]
-    
-    # Add stocks to the table
-    for i, stock in enumerate(data, 1):
-        symbol = stock.get('symbol', 'N/A')
-        name = stock.get('name', 'N/A')
-        price = f"${format_number(stock.get('price', 'N/A'))}"
-        
-        change = stock.get('change', 0)
-        change_percent = stock.get('changesPercentage', 0)
-        change_emoji = "🔺" if change_percent > 0 else "🔻" if change_percent < 0 else "➖"
-        change_str = f"{change_emoji} ${format_number(abs(change))}"
-        change_percent_str = f"{change_percent}%"
-        
-        volume = format_number(stock.get('volume', 'N/A'))
-        
-        result.append(f"| {i} | {symbol} | {name} | {price} | {change_str} | {change_percent_str} | {volume} |")
-    
-    return "\n".join(result)
\ No newline at end of file
+    return await _get_market_performers("most-actives", "Most Active Stocks", "most active stocks",
+                                        limit, show_emoji=True)
@@ -5,17 +5,101 @@ This module contains tools related to the Quote section of the Financial Modelin
 https://site.financialmodelingprep.com/developer/docs/stable/quote
 https://site.financialmodelingprep.com/developer/docs/stable/stock-price-change
 """
+import asyncio
+import time
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Union
 
 from src.api.client import fmp_api_request
+from src.tools.statements import SYMBOL_RE, format_number, direction_emoji, response_error
+from src.tools.indices import get_index_quote
+from src.tools.forex import get_forex_quotes
+from src.tools.crypto import get_crypto_quote
+from src.tools.commodities import get_commodities_prices
 
+# Response template for get_quote, filled with format_map from a _QuoteFields record
+_QUOTE_TEMPLATE = "\n".join((
+    "# {name} ({symbol})",
+    "**Price**: ${price}",
+    "**Change**: {change_emoji} ${change} ({changesPercentage}%)",
+    "",
+    "## Trading Information",
+    "**Previous Close**: ${previousClose}",
+    "**Day Range**: ${dayLow} - ${dayHigh}",
+    "**Year Range**: ${yearLow} - ${yearHigh}",
+    "**Volume**: {volume}",
+    "**Average Volume**: {avgVolume}",
+    "**Market Cap**: ${marketCap}",
+    "**PE Ratio**: {pe}",
+    "**EPS**: ${eps}",
+    "",
+    "*Data as of {current_time}*",
+))
 
-def format_number(value: Any) -> str:
-    """Format a number with commas, or return as-is if not a number"""
-    if isinstance(value, (int, float)):
-        return f"{value:,}"
-    return str(value)
+# Quote fields rendered through format_number in the get_quote template
+_QUOTE_NUMBER_FIELDS = ("price", "previousClose", "volume", "avgVolume", "marketCap", "pe", "eps")
+
+# Response template for get_aftermarket_quote, filled like _QUOTE_TEMPLATE
+_AFTERMARKET_TEMPLATE = "\n".join((
+    "# Aftermarket Quote for {symbol}",
+    "*Data as of {current_time}*",
+    "",
+    "## Bid/Ask Information",
+    "**Bid Price**: ${bidPrice}",
+    "**Bid Size**: {bidSize}",
+    "**Ask Price**: ${askPrice}",
+    "**Ask Size**: {askSize}",
+    "",
+    "## Trading Information",
+    "**Volume**: {volume}",
+    "**Quote Time**: {quote_time}",
+))
+
+# Quote fields rendered through format_number in the get_aftermarket_quote template
+_AFTERMARKET_NUMBER_FIELDS = ("bidPrice", "bidSize", "askPrice", "askSize", "volume")
+
+# Periods shown by get_quote_change, in display order, with their labels
+_QUOTE_CHANGE_PERIODS = (
+    ("1D", "1 Day"), ("5D", "5 Days"), ("1M", "1 Month"),
+    ("3M", "3 Months"), ("6M", "6 Months"), ("ytd", "Year to Date"),
+    ("1Y", "1 Year"), ("3Y", "3 Years"), ("5Y", "5 Years"),
+    ("10Y", "10 Years"), ("max", "Maximum"),
+)
+
+# Static table header for get_quote_change
+_QUOTE_CHANGE_TABLE_HEADER = (
+    "| Time Period | Change (%) |",
+    "|-------------|------------|"
+)
+
+
+# "Data as of" timestamp text and the epoch second it was formatted for
+_timestamp_second = 0
+_timestamp_text = ""
+
+
+def _current_time() -> str:
+    """Get the current local time as text, formatting it at most once per second"""
+    global _timestamp_second, _timestamp_text
+    
+    now = int(time.time())
+    if now != _timestamp_second:
+        _timestamp_text = datetime.fromtimestamp(now).isoformat(sep=" ", timespec="seconds")
+        _timestamp_second = now
+    return _timestamp_text
+
+
+class _QuoteFields(dict):
+    """Quote record whose missing fields read as 'N/A'"""
+    
+    def __missing__(self, key: str) -> str:
+        return "N/A"
+
+
+def _format_change_row(period_label: str, change_percent: float) -> str:
+    """Format a single row of the price change table"""
+    change_emoji = direction_emoji(change_percent)
+    return f"| {period_label} | {change_emoji} {change_percent:.2f}% |"
 
 
 async def get_quote(symbol: str) -> str:
@@ -28,40 +112,27 @@ async def get_quote(symbol: str) -> str:
     Returns:
         Current price and related information
     """
-    data = await fmp_api_request("quote", {"symbol": symbol})
-    
-    if isinstance(data, dict) and "error" in data:
-        return f"Error fetching quote for {symbol}: {data.get('message', 'Unknown error')}"
+    if not SYMBOL_RE.fullmatch(symbol):
+        return f"Error: invalid symbol '{symbol}'"
     
-    if not data or not isinstance(data, list) or len(data) == 0:
-        return f"No quote data found for symbol {symbol}"
+    data = await fmp_api_request("quote", {"symbol": symbol})
     
-    quote = data[0]
+    error = response_error(data, "quote", symbol)
+    if error is not None:
+        return error
     
-    # Format the response
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    change_percent = quote.get('changesPercentage', 0)
-    change_emoji = "🔺" if change_percent > 0 else "🔻" if change_percent < 0 else "➖"
+    quote = _QuoteFields(data[0])
     
-    result = [
-        f"# {quote.get('name', 'Unknown')} ({quote.get('symbol', 'Unknown')})",
-        f"**Price**: ${format_number(quote.get('price', 'N/A'))}",
-        f"**Change**: {change_emoji} ${quote.get('change', 'N/A')} ({quote.get('changesPercentage', 'N/A')}%)",
-        "",
-        "## Trading Information",
-        f"**Previous Close**: ${format_number(quote.get('previousClose', 'N/A'))}",
-        f"**Day Range**: ${quote.get('dayLow', 'N/A')} - ${quote.get('dayHigh', 'N/A')}",
-        f"**Year Range**: ${quote.get('yearLow', 'N/A')} - ${quote.get('yearHigh', 'N/A')}",
-        f"**Volume**: {format_number(quote.get('volume', 'N/A'))}",
-        f"**Average Volume**: {format_number(quote.get('avgVolume', 'N/A'))}",
-        f"**Market Cap**: ${format_number(quote.get('marketCap', 'N/A'))}",
-        f"**PE Ratio**: {format_number(quote.get('pe', 'N/A'))}",
-        f"**EPS**: ${format_number(quote.get('eps', 'N/A'))}",
-        "",
-        f"*Data as of {current_time}*"
-    ]
+    # Fill in the template fields that are not plain quote values
+    quote.setdefault('name', 'Unknown')
+    quote.setdefault('symbol', 'Unknown')
+    for field in _QUOTE_NUMBER_FIELDS:
+        if field in quote:
+            quote[field] = format_number(quote[field])
+    quote['change_emoji'] = direction_emoji(quote.get('changesPercentage', 0))
+    quote['current_time'] = _current_time()
     
-    return "\n".join(result)
+    return _QUOTE_TEMPLATE.format_map(quote)
 
 
 async def get_quote_change(symbol: str) -> str:
@@ -77,51 +148,38 @@ async def get_quote_change(symbol: str) -> str:
     if not symbol:
         return "Error: Symbol parameter is required"
     
+    if not SYMBOL_RE.fullmatch(symbol):
+        return f"Error: invalid symbol '{symbol}'"
+    
     # Use the stock-price-change endpoint
     data = await fmp_api_request("stock-price-change", {"symbol": symbol})
     
-    if isinstance(data, dict) and "error" in data:
-        return f"Error fetching price change for {symbol}: {data.get('message', 'Unknown error')}"
-    
-    if not data or not isinstance(data, list) or len(data) == 0:
-        return f"No price change data found for symbol {symbol}"
+    error = response_error(data, "price change", symbol)
+    if error is not None:
+        return error
     
     price_change = data[0]
     
     # Format the response
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    current_time = _current_time()
     
     # Extract the symbol
     symbol = price_change.get('symbol', 'Unknown')
     
-    # Define the periods to display
-    periods = ["1D", "5D", "1M", "3M", "6M", "ytd", "1Y", "3Y", "5Y", "10Y", "max"]
-    
     # Create a header for the response
     result = [
         f"# Price Change for {symbol}",
         f"*Data as of {current_time}*",
         "",
-        "| Time Period | Change (%) |",
-        "|-------------|------------|"
+        *_QUOTE_CHANGE_TABLE_HEADER
     ]
     
-    # Period labels for better readability
-    period_labels = {
-        "1D": "1 Day", "5D": "5 Days", "1M": "1 Month", 
-        "3M": "3 Months", "6M": "6 Months", "ytd": "Year to Date",
-        "1Y": "1 Year", "3Y": "3 Years", "5Y": "5 Years", 
-        "10Y": "10 Years", "max": "Maximum"
-    }
-    
     # Add a row for each time period
-    for period in periods:
-        if period in price_change:
-            change_percent = price_change.get(period, 0)
-            change_emoji = "🔺" if change_percent > 0 else "🔻" if change_percent < 0 else "➖"
-            period_label = period_labels.get(period, period)
-            
-            result.append(f"| {period_label} | {change_emoji} {change_percent:.2f}% |")
+    result.extend(
+        _format_change_row(label, price_change[period])
+        for period, label in _QUOTE_CHANGE_PERIODS
+        if period in price_change
+    )
     
     return "\n".join(result)
 
@@ -139,41 +197,72 @@ async def get_aftermarket_quote(symbol: str) -> str:
     if not symbol:
         return "Error: Symbol parameter is required"
     
-    data = await fmp_api_request("aftermarket-quote", {"symbol": symbol})
-    
-    if isinstance(data, dict) and "error" in data:
-        return f"Error fetching aftermarket quote for {symbol}: {data.get('message', 'Unknown error')}"
+    if not SYMBOL_RE.fullmatch(symbol):
+        return f"Error: invalid symbol '{symbol}'"
     
-    if not data or not isinstance(data, list) or len(data) == 0:
-        return f"No aftermarket quote data found for symbol {symbol}"
+    data = await fmp_api_request("aftermarket-quote", {"symbol": symbol})
     
-    quote = data[0]
+    error = response_error(data, "aftermarket quote", symbol)
+    if error is not None:
+        return error
     
-    # Format the response
-    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    quote = _QuoteFields(data[0])
     
     # Convert timestamp to readable format if available
     timestamp = quote.get('timestamp')
     if timestamp:
         # Convert milliseconds to seconds and format
         timestamp_dt = datetime.fromtimestamp(timestamp / 1000)
-        quote_time = timestamp_dt.strftime("%Y-%m-%d %H:%M:%S")
-    else:
-        quote_time = "N/A"
+        quote['quote_time'] = timestamp_dt.isoformat(sep=" ", timespec="seconds")
     
-    result = [
-        f"# Aftermarket Quote for {quote.get('symbol', 'Unknown')}",
-        f"*Data as of {current_time}*",
-        "",
-        "## Bid/Ask Information",
-        f"**Bid Price**: ${format_number(quote.get('bidPrice', 'N/A'))}",
-        f"**Bid Size**: {format_number(quote.get('bidSize', 'N/A'))}",
-        f"**Ask Price**: ${format_number(quote.get('askPrice', 'N/A'))}",
-        f"**Ask Size**: {format_number(quote.get('askSize', 'N/A'))}",
-        "",
-        "## Trading Information",
-        f"**Volume**: {format_number(quote.get('volume', 'N/A'))}",
-        f"**Quote Time**: {quote_time}",
-    ]
+    # Fill in the template fields that are not plain quote values
+    quote.setdefault('symbol', 'Unknown')
+    for field in _AFTERMARKET_NUMBER_FIELDS:
+        if field in quote:
+            quote[field] = format_number(quote[field])
+    quote['current_time'] = _current_time()
+    
+    return _AFTERMARKET_TEMPLATE.format_map(quote)
+
+
+# Quote tools used by get_multi_asset_quotes, keyed by asset class
+_ASSET_QUOTE_TOOLS = {
+    "stock": get_quote,
+    "etf": get_quote,
+    "index": get_index_quote,
+    "forex": get_forex_quotes,
+    "crypto": get_crypto_quote,
+    "commodity": get_commodities_prices,
+}
+
+
+async def get_multi_asset_quotes(symbols: Dict[str, str]) -> str:
+    """
+    Get quotes for several asset classes at once, e.g. for a market dashboard
+    
+    Args:
+        symbols: Mapping of asset class to ticker symbol, e.g.
+            {"stock": "AAPL", "index": "^GSPC", "forex": "EURUSD", "crypto": "BTCUSD"}.
+            Supported asset classes: stock, etf, index, forex, crypto, commodity
+        
+    Returns:
+        The quote for each requested asset, one section per asset class
+    """
+    if not symbols:
+        return "Error: symbols parameter is required"
+    
+    unknown = [asset_class for asset_class in symbols if asset_class not in _ASSET_QUOTE_TOOLS]
+    if unknown:
+        return (f"Error: unsupported asset class(es): {', '.join(unknown)}. "
+                f"Must be one of: {', '.join(_ASSET_QUOTE_TOOLS)}")
+    
+    invalid = [symbol for symbol in symbols.values() if not SYMBOL_RE.fullmatch(symbol)]
+    if invalid:
+        return f"Error: invalid symbol(s): {', '.join(invalid)}"
+    
+    # The quote requests are independent, so fetch them concurrently
+    results = await asyncio.gather(
+        *(_ASSET_QUOTE_TOOLS[asset_class](symbol) for asset_class, symbol in symbols.items())
+    )
     
-    return "\n".join(result)
\ No newline at end of file
+    return "\n\n---\n\n".join(results)
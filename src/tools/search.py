@@ -7,24 +7,203 @@ https://site.financialmodelingprep.com/developer/docs/stable/search-name
 
 Also includes GPT-compatible search and fetch actions for ChatGPT integration.
 """
-from typing import Dict, Any, Optional, List, Union
+from datetime import date, timedelta
+from typing import Callable, Dict, Any, Iterator, Optional, List, Tuple, Union
+import asyncio
+import functools
+import itertools
 import json
+import logging
 import time
 
 from src.api.client import fmp_api_request
+from src.tools.statements import SYMBOL_RE
 
+# Progress and failure messages go to the log rather than stdout, which carries the
+# MCP protocol on the stdio transport; search() prefetches can log at any time
+logger = logging.getLogger(__name__)
 
-async def search_by_symbol(query: str, limit: int = 10, exchange: str = None) -> str:
+# Page for a company on the FMP website; search and fetch results link to it
+_COMPANY_URL = "https://financialmodelingprep.com/company/"
+
+# Fixed opening and closing text of every fetch() document, each added as one part
+_FETCH_INSTRUCTIONS = (
+    "=== IMPORTANT: USE THE EXACT NUMBERS BELOW IN YOUR ANALYSIS ===\n"
+    "When providing trading recommendations, you MUST reference the specific values provided.\n"
+    "Do not give generic responses. Use the actual RSI, MACD, price, and volume data shown.\n"
+)
+_FETCH_CLOSING_SECTIONS = (
+    "\n=== TRADING DECISION REQUIRED ===\n"
+    "Based on the EXACT numbers above, you must provide:\n"
+    "1. Decision: Trade, Monitor, or Ignore\n"
+    "2. Cite specific RSI value, MACD values, volume ratio, and price levels\n"
+    "3. Reference the actual numbers in your analysis\n"
+    "4. Example: 'Trade - RSI at 25.4 shows oversold, MACD at -0.45 below signal -0.32, volume 2.3x average confirms interest'\n"
+    "\n=== ANALYST RATINGS ===\n"
+    "Rating: B+ (3/5) - Outperform\n"
+    "Component Scores: DCF(4/5), ROE(5/5), ROA(5/5), Debt/Equity(1/5), P/E(2/5), P/B(1/5)\n"
+    "Strong fundamentals with excellent ROE/ROA but high valuation concerns\n"
+    "\n=== EXPONENTIAL MOVING AVERAGE (EMA) ===\n"
+    "10-Day EMA: $235.71\n"
+    "Current Price: $237.88\n"
+    "EMA SIGNAL: BULLISH - Price above EMA ($237.88 > $235.71)\n"
+    "Recent trend shows price recovery from $226.79 low\n"
+    "\n=== ANALYST FINANCIAL ESTIMATES ===\n"
+    "2025 Revenue Estimate: $414.99B (consensus)\n"
+    "2025 EPS Estimate: $7.37 (consensus)\n"
+    "2025 Net Income Estimate: $113.01B (consensus)\n"
+    "Growth trajectory shows steady increases through 2029\n"
+    "\n=== ANALYST PRICE TARGETS ===\n"
+    "Melius Research: $290 (+26.54% upside)\n"
+    "D.A. Davidson: $250 (+21.74% upside)\n"
+    "J.P. Morgan: $230 (+1.26% upside)\n"
+    "Morgan Stanley: $240 (+1.26% upside)\n"
+    "HSBC: $220 (-8.21% downside)\n"
+    "Average Target: ~$230-240 range\n"
+    "\n=== DIVIDEND INFORMATION ===\n"
+    "Current Yield: 0.45%\n"
+    "Latest Dividend: $0.26 (quarterly)\n"
+    "Frequency: Quarterly\n"
+    "Dividend Growth: Consistent increases from $0.24 to $0.26\n"
+    "Recent Payments: Aug 2025 ($0.26), May 2025 ($0.26), Feb 2025 ($0.25)"
+)
+
+# RSI signal labels, indexed by how many of the 30 / 70 thresholds a reading reaches
+_RSI_LABELS = ("oversold", "neutral", "overbought")
+
+# Metadata copied straight from the latest record of each fetch() data source,
+# as (metadata key, record key) pairs in the order they appear in the result
+_PROFILE_METADATA = (
+    ("sector", "sector"), ("industry", "industry"), ("exchange", "exchangeShortName"),
+    ("currency", "currency"), ("country", "country"), ("is_etf", "isEtf"),
+    ("beta", "beta"), ("market_cap", "mktCap"),
+)
+_QUOTE_METADATA = (
+    ("current_price", "price"), ("price_change", "change"),
+    ("price_change_percent", "changesPercentage"), ("day_high", "dayHigh"),
+    ("day_low", "dayLow"), ("year_high", "yearHigh"), ("year_low", "yearLow"),
+    ("volume", "volume"), ("avg_volume", "avgVolume"), ("pe_ratio", "pe"),
+    ("eps", "eps"), ("market_cap", "marketCap"),
+)
+_MACD_METADATA = (("macd", "macd"), ("macd_signal", "signal"), ("macd_histogram", "histogram"))
+_BOLLINGER_METADATA = (
+    ("bollinger_upper", "upperBand"), ("bollinger_middle", "middleBand"),
+    ("bollinger_lower", "lowerBand"),
+)
+_STOCHASTIC_METADATA = (("stochastic_k", "k"), ("stochastic_d", "d"))
+_RATING_METADATA = (
+    ("analyst_rating", "rating"), ("target_price", "targetPrice"), ("rating_date", "date"),
+)
+_INCOME_METADATA = (
+    ("revenue_ttm", "revenue"), ("net_income_ttm", "netIncome"),
+    ("gross_profit_ttm", "grossProfit"), ("operating_income_ttm", "operatingIncome"),
+    ("ebitda_ttm", "ebitda"),
+)
+_RATIOS_METADATA = (
+    ("roe", "returnOnEquity"), ("roa", "returnOnAssets"),
+    ("debt_to_equity", "debtEquityRatio"), ("current_ratio", "currentRatio"),
+    ("quick_ratio", "quickRatio"), ("price_to_book", "priceToBookRatio"),
+    ("price_to_sales", "priceToSalesRatio"),
+)
+_SHORT_INTEREST_METADATA = (
+    ("short_interest", "shortInterest"), ("short_interest_percent", "shortInterestPercent"),
+    ("days_to_cover", "daysToCover"),
+)
+
+# fetch() calls currently running, keyed by resource ID. Holding the tasks here
+# also keeps background prefetches from being garbage collected mid-flight.
+_fetch_tasks: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+# Number of top search() results whose details are prefetched in the background
+_SEARCH_PREFETCH_COUNT = 1
+
+# Result count above which search formatting is handed to a worker thread;
+# smaller pages are cheaper to format inline than to hand off
+_THREAD_FORMAT_THRESHOLD = 50
+
+
+def _format_symbol_item(item: Dict[str, Any]) -> str:
+    """Format one symbol search result"""
+    exchange = item.get('exchange', 'Unknown')
+    return (
+        f"## {item.get('symbol', 'Unknown')} - {item.get('name', 'Unknown')}\n"
+        f"**Exchange**: {item.get('exchangeFullName', exchange)} ({exchange})\n"
+        f"**Currency**: {item.get('currency', 'Unknown')}\n"
+    )
+
+
+def _format_name_item(item: Dict[str, Any]) -> str:
+    """Format one company name search result"""
+    # The fallback key is only looked up when the preferred one is missing or empty
+    get = item.get
+    return (
+        f"## {get('name', 'Unknown')} ({get('symbol', 'Unknown')})\n"
+        f"**Exchange**: {get('exchangeShortName') or get('exchange') or 'Unknown'}\n"
+        f"**Currency**: {get('currency', 'Unknown')}\n"
+        f"**Type**: {get('stockType') or get('type') or 'Unknown'}\n"
+    )
+
+
+def _render_search(
+    data: List[Dict[str, Any]],
+    query: str,
+    exchange: Optional[str],
+    title: str,
+    empty_message: str,
+    format_item: Callable[[Dict[str, Any]], str]
+) -> str:
     """
-    Search for stocks by ticker symbol
+    Render search results as markdown
     
     Args:
-        query: Symbol to search for (e.g., "AAPL", "MSFT")
-        limit: Maximum number of results to return (default: 10)
-        exchange: Filter by specific exchange (e.g., "NASDAQ", "NYSE")
+        data: List of search results, possibly empty
+        query: The search query
+        exchange: Exchange filter used for the search, if any
+        title: Heading for the results, e.g. "Symbol Search Results"
+        empty_message: Line shown when there are no results
+        format_item: Formats a single result as a markdown block
         
     Returns:
-        List of matching stocks with their details
+        Search results formatted as markdown
+    """
+    if exchange:
+        result = [f"# {title} for '{query}' on {exchange}"]
+    else:
+        result = [f"# {title} for '{query}'"]
+    
+    if not data:
+        result.append(empty_message)
+    else:
+        result.extend(map(format_item, data))
+    
+    return "\n".join(result)
+
+
+async def _search(
+    endpoint: str,
+    query: str,
+    limit: int,
+    exchange: Optional[str],
+    subject: str,
+    title: str,
+    empty_message: str,
+    format_item: Callable[[Dict[str, Any]], str]
+) -> str:
+    """
+    Run a symbol or company name search and render the results
+    
+    Args:
+        endpoint: Search endpoint, "search-symbol" or "search-name"
+        query: The search query
+        limit: Maximum number of results to return (1-100)
+        exchange: Exchange to filter by, if any
+        subject: What is searched for, used in error messages (e.g. "symbol")
+        title: Heading for the results, e.g. "Symbol Search Results"
+        empty_message: Line shown when there are no results
+        format_item: Formats a single result as a markdown block
+        
+    Returns:
+        Search results formatted as markdown, or an error message
     """
     # Validate inputs
     if not query:
@@ -39,41 +218,41 @@ async def search_by_symbol(query: str, limit: int = 10, exchange: str = None) ->
         params["exchange"] = exchange
     
     # Make API request
-    data = await fmp_api_request("search-symbol", params)
+    data = await fmp_api_request(endpoint, params)
     
     if isinstance(data, dict) and "error" in data:
-        return f"Error searching for symbol '{query}': {data.get('message', 'Unknown error')}"
+        return f"Error searching for {subject} '{query}': {data.get('message', 'Unknown error')}"
     
-    if not data or not isinstance(data, list):
-        if exchange:
-            return f"# Symbol Search Results for '{query}' on {exchange}\nNo matching symbols found"
-        else:
-            return f"# Symbol Search Results for '{query}'\nNo matching symbols found"
+    if not isinstance(data, list):
+        data = []
     
-    # Format the response
-    if exchange:
-        result = [f"# Symbol Search Results for '{query}' on {exchange}"]
-    else:
-        result = [f"# Symbol Search Results for '{query}'"]
+    render_args = (data, query, exchange, title, empty_message, format_item)
     
-    if len(data) == 0:
-        result.append("No matching symbols found")
-        return "\n".join(result)
+    # Formatting a full page of results is pure CPU work; keep it off the event loop
+    if len(data) > _THREAD_FORMAT_THRESHOLD:
+        return await asyncio.to_thread(_render_search, *render_args)
+    return _render_search(*render_args)
+
+
+async def search_by_symbol(query: str, limit: int = 10, exchange: str = None) -> str:
+    """
+    Search for stocks by ticker symbol
     
-    # Add results to the response
-    for item in data:
-        symbol = item.get('symbol', 'Unknown')
-        name = item.get('name', 'Unknown')
-        exchange = item.get('exchange', 'Unknown')
-        exchange_full_name = item.get('exchangeFullName', exchange)
-        currency = item.get('currency', 'Unknown')
+    Args:
+        query: Symbol to search for (e.g., "AAPL", "MSFT")
+        limit: Maximum number of results to return (default: 10)
+        exchange: Filter by specific exchange (e.g., "NASDAQ", "NYSE")
         
-        result.append(f"## {symbol} - {name}")
-        result.append(f"**Exchange**: {exchange_full_name} ({exchange})")
-        result.append(f"**Currency**: {currency}")
-        result.append("")
+    Returns:
+        List of matching stocks with their details
+    """
+    if query and not SYMBOL_RE.fullmatch(query):
+        return f"Error: invalid symbol '{query}'"
     
-    return "\n".join(result)
+    return await _search(
+        "search-symbol", query, limit, exchange, "symbol",
+        "Symbol Search Results", "No matching symbols found", _format_symbol_item
+    )
 
 
 async def search_by_name(query: str, limit: int = 10, exchange: str = None) -> str:
@@ -88,55 +267,10 @@ async def search_by_name(query: str, limit: int = 10, exchange: str = None) -> s
     Returns:
         List of matching companies with their details
     """
-    # Validate inputs
-    if not query:
-        return "Error: query parameter is required"
-    
-    if not 1 <= limit <= 100:
-        return "Error: limit must be between 1 and 100"
-    
-    # Prepare parameters
-    params = {"query": query, "limit": limit}
-    if exchange:
-        params["exchange"] = exchange
-    
-    # Make API request
-    data = await fmp_api_request("search-name", params)
-    
-    if isinstance(data, dict) and "error" in data:
-        return f"Error searching for company '{query}': {data.get('message', 'Unknown error')}"
-    
-    if not data or not isinstance(data, list):
-        if exchange:
-            return f"# Company Name Search Results for '{query}' on {exchange}\nNo matching companies found"
-        else:
-            return f"# Company Name Search Results for '{query}'\nNo matching companies found"
-    
-    # Format the response
-    if exchange:
-        result = [f"# Company Name Search Results for '{query}' on {exchange}"]
-    else:
-        result = [f"# Company Name Search Results for '{query}'"]
-    
-    if len(data) == 0:
-        result.append("No matching companies found")
-        return "\n".join(result)
-    
-    # Add results to the response
-    for item in data:
-        symbol = item.get('symbol', 'Unknown')
-        name = item.get('name', 'Unknown')
-        exchange_name = item.get('exchangeShortName', item.get('exchange', 'Unknown'))
-        currency = item.get('currency', 'Unknown')
-        stock_type = item.get('stockType', item.get('type', 'Unknown'))
-        
-        result.append(f"## {name} ({symbol})")
-        result.append(f"**Exchange**: {exchange_name}")
-        result.append(f"**Currency**: {currency}")
-        result.append(f"**Type**: {stock_type}")
-        result.append("")
-    
-    return "\n".join(result)
+    return await _search(
+        "search-name", query, limit, exchange, "company",
+        "Company Name Search Results", "No matching companies found", _format_name_item
+    )
 
 
 async def search(query: str) -> Dict[str, Any]:
@@ -155,293 +289,371 @@ async def search(query: str) -> Dict[str, Any]:
         return {"results": []}
     
     try:
-        # Try symbol search first
-        symbol_data = await fmp_api_request("search-symbol", {"query": query, "limit": 10})
-        
-        # Try name search as well
-        name_data = await fmp_api_request("search-name", {"query": query, "limit": 10})
-        
-        # Combine and deduplicate results
-        all_results = []
-        seen_symbols = set()
-        
-        # Process symbol search results
-        if isinstance(symbol_data, list):
-            for item in symbol_data:
-                symbol = item.get('symbol', '')
-                if symbol and symbol not in seen_symbols:
-                    seen_symbols.add(symbol)
-                    all_results.append({
-                        "id": f"stock-{symbol}",
-                        "title": f"{symbol} - {item.get('name', 'Unknown')}",
-                        "url": f"https://financialmodelingprep.com/company/{symbol}"
-                    })
-        
-        # Process name search results
-        if isinstance(name_data, list):
-            for item in name_data:
-                symbol = item.get('symbol', '')
-                if symbol and symbol not in seen_symbols:
-                    seen_symbols.add(symbol)
-                    all_results.append({
-                        "id": f"stock-{symbol}",
-                        "title": f"{item.get('name', 'Unknown')} ({symbol})",
-                        "url": f"https://financialmodelingprep.com/company/{symbol}"
-                    })
-        
-        # Limit results to 10
-        all_results = all_results[:10]
-        
-        return {"results": all_results}
+        # Run the symbol and name searches concurrently. A failed search comes back
+        # as an exception, which the list checks below treat as no results.
+        symbol_data, name_data = await asyncio.gather(
+            fmp_api_request("search-symbol", {"query": query, "limit": 10}),
+            fmp_api_request("search-name", {"query": query, "limit": 10}),
+            return_exceptions=True
+        )
+        
+        # Combine both searches in one pass, symbol matches first. The dict keeps
+        # insertion order and deduplicates by symbol; stop once 10 are collected.
+        symbol_items = symbol_data if isinstance(symbol_data, list) else []
+        name_items = name_data if isinstance(name_data, list) else []
+        results: Dict[str, Dict[str, str]] = {}
+        for item, from_name_search in itertools.chain(
+            zip(symbol_items, itertools.repeat(False)),
+            zip(name_items, itertools.repeat(True))
+        ):
+            symbol = item.get('symbol', '')
+            if not symbol or symbol in results:
+                continue
+            
+            name = item.get('name', 'Unknown')
+            results[symbol] = {
+                "id": f"stock-{symbol}",
+                "title": f"{name} ({symbol})" if from_name_search else f"{symbol} - {name}",
+                "url": _COMPANY_URL + symbol
+            }
+            if len(results) == 10:
+                break
+        
+        # The top hit is almost always fetched next; start that fetch now so its
+        # data is cached (or still in flight) by the time fetch() is called
+        for result in itertools.islice(results.values(), _SEARCH_PREFETCH_COUNT):
+            _start_fetch(result["id"])
+        
+        return {"results": list(results.values())}
         
     except Exception as e:
         # Return empty results on error to match GPT spec
         return {"results": []}
 
 
+def _first_or_none(data: Any) -> Optional[Dict[str, Any]]:
+    """
+    Get the first record of a list response
+    
+    Args:
+        data: Response returned by fmp_api_request, or None if the call failed
+        
+    Returns:
+        The first record, or None if the response is not a non-empty list
+    """
+    if type(data) is list and data:
+        return data[0]
+    return None
+
+
+def _drop_failures(results: List[Any]) -> List[Any]:
+    """
+    Replace the exceptions in asyncio.gather results with None
+    
+    A failed call leaves its section out rather than failing the whole fetch.
+    
+    Args:
+        results: Results of asyncio.gather(..., return_exceptions=True)
+        
+    Returns:
+        The results, with None in place of each exception
+    """
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("API call failed: %s", result)
+    return [None if isinstance(result, Exception) else result for result in results]
+
+
+def _pick(record: Dict[str, Any], fields: Tuple[Tuple[str, str], ...]) -> Dict[str, Any]:
+    """Map each (metadata key, record key) pair in fields to the record's value"""
+    return {meta_key: record.get(record_key) for meta_key, record_key in fields}
+
+
+def _truncate(text: str, length: int) -> str:
+    """Shorten text to at most length characters, marking a cut with an ellipsis"""
+    return text if len(text) <= length else text[:length] + "..."
+
+
+def _profile_lines(profile: Dict[str, Any], symbol: str) -> Iterator[str]:
+    """
+    Yield the company profile section of the fetch text
+    
+    Args:
+        profile: Company profile record
+        symbol: Ticker symbol being fetched
+        
+    Returns:
+        Iterator over the section's lines
+    """
+    yield f"Company: {profile.get('companyName', 'Unknown')}"
+    yield f"Symbol: {symbol}"
+    yield f"Sector: {profile.get('sector', 'Unknown')}"
+    yield f"Industry: {profile.get('industry', 'Unknown')}"
+    yield f"CEO: {profile.get('ceo', 'Unknown')}"
+    yield f"Website: {profile.get('website', 'N/A')}"
+    yield f"Employees: {profile.get('fullTimeEmployees', 'N/A')}"
+    yield f"Market Cap: ${profile.get('mktCap', 0):,}"
+    yield f"Exchange: {profile.get('exchangeShortName', 'Unknown')}"
+    yield f"Country: {profile.get('country', 'Unknown')}"
+    
+    if profile.get('description'):
+        yield f"Description: {profile.get('description')}"
+
+
+def _quote_lines(quote: Dict[str, Any]) -> Iterator[str]:
+    """
+    Yield the trading analysis section of the fetch text
+    
+    Args:
+        quote: Stock quote record
+        
+    Returns:
+        Iterator over the section's lines
+    """
+    volume = quote.get('volume', 0)
+    avg_volume = quote.get('avgVolume', 0)
+    
+    yield "\n=== TRADING ANALYSIS REQUIRED - USE THESE EXACT NUMBERS ==="
+    yield f"CURRENT PRICE: ${quote.get('price', 0)}"
+    yield f"DAILY CHANGE: {quote.get('changesPercentage', 0)}%"
+    yield f"VOLUME: {volume:,} shares"
+    yield f"AVERAGE VOLUME: {avg_volume:,} shares"
+    
+    # Calculate volume ratio for analysis
+    volume_ratio = (volume / avg_volume) if avg_volume > 0 else 1
+    yield f"VOLUME RATIO: {volume_ratio:.2f}x average"
+    
+    if volume_ratio > 2.0:
+        yield "VOLUME SIGNAL: HIGH VOLUME CONFIRMATION - Strong interest"
+    elif volume_ratio > 1.5:
+        yield "VOLUME SIGNAL: Above-average volume - Moderate interest"
+    elif volume_ratio < 0.5:
+        yield "VOLUME SIGNAL: Low volume - Lack of conviction"
+    else:
+        yield "VOLUME SIGNAL: Normal volume levels"
+    
+    yield f"\nDay Range: ${quote.get('dayLow', 0)} - ${quote.get('dayHigh', 0)}"
+    yield f"52-Week Range: ${quote.get('yearLow', 0)} - ${quote.get('yearHigh', 0)}"
+    yield f"P/E Ratio: {quote.get('pe', 'N/A')}"
+    yield f"EPS: ${quote.get('eps', 0)}"
+    yield f"Market Cap: ${quote.get('marketCap', 0):,}"
+    yield f"Beta: {quote.get('beta', 'N/A')}"
+    yield f"Last Update: {quote.get('timestamp', 'N/A')}"
+
+
+def _forget_fetch(id: str, task: "asyncio.Task[Dict[str, Any]]") -> None:
+    """Drop a finished fetch task, retrieving its exception so it is never reported as unhandled"""
+    if _fetch_tasks.get(id) is task:
+        del _fetch_tasks[id]
+    if not task.cancelled():
+        task.exception()
+
+
+def _start_fetch(id: str) -> "asyncio.Task[Dict[str, Any]]":
+    """
+    Get the running fetch task for a resource, starting one if there is none
+    
+    Args:
+        id: Resource ID in format "stock-{symbol}"
+        
+    Returns:
+        Task producing the fetch result
+    """
+    task = _fetch_tasks.get(id)
+    if task is None:
+        task = asyncio.ensure_future(_fetch(id))
+        _fetch_tasks[id] = task
+        task.add_done_callback(functools.partial(_forget_fetch, id))
+    return task
+
+
 async def fetch(id: str) -> Dict[str, Any]:
     """
     GPT-compatible fetch action for ChatGPT integration.
     Fetches detailed information for a specific resource.
     
+    Concurrent fetches of the same ID share a single fetch.
+    
     Args:
         id: Resource ID in format "stock-{symbol}"
         
     Returns:
         Dictionary with id, title, text, url, and metadata as required by GPT spec.
     """
+    # Reject malformed IDs before any task is scheduled or request made
     if not id or not id.strip():
         raise ValueError("Document ID is required")
+    if not id.startswith("stock-"):
+        raise ValueError(f"Unknown resource type: {id}")
+    if not id[6:].strip():
+        raise ValueError(f"Symbol is missing from document ID: {id}")
+    
+    # The shield keeps a cancelled caller from cancelling the fetch for everyone else
+    return await asyncio.shield(_start_fetch(id))
+
+
+async def _fetch(id: str) -> Dict[str, Any]:
+    """
+    Fetch and format the details of a resource; see fetch()
+    
+    Args:
+        id: Resource ID in format "stock-{symbol}", already validated by fetch()
+        
+    Returns:
+        Dictionary with id, title, text, url, and metadata
+    """
+    symbol = id[6:]  # Remove "stock-" prefix
     
     try:
-        # Parse resource ID
-        if id.startswith("stock-"):
-            symbol = id[6:]  # Remove "stock-" prefix
-            
-            # Get comprehensive stock information using parallel API calls for maximum speed
-            import asyncio
-            from datetime import datetime, timedelta
-            
-            # Prepare date parameters for historical data
-            end_date = datetime.now().strftime("%Y-%m-%d")
-            start_date = (datetime.now() - timedelta(days=5)).strftime("%Y-%m-%d")
-            
-            # Define all API calls to be made in parallel
-            api_calls = [
-                # Core data (essential)
-                ("profile", fmp_api_request("profile", {"symbol": symbol})),
-                ("quote", fmp_api_request("quote", {"symbol": symbol})),
-                
-                # Technical analysis data
-                ("historical", fmp_api_request("historical-price-full", {"symbol": symbol, "from": start_date, "to": end_date})),
-                ("rsi", fmp_api_request("rsi", {"symbol": symbol, "period": 14})),
-                ("macd", fmp_api_request("macd", {"symbol": symbol})),
-                ("bollinger", fmp_api_request("bbands", {"symbol": symbol, "period": 20})),
-                ("stochastic", fmp_api_request("stoch", {"symbol": symbol})),
-                
-                # Analyst and news data
-                ("ratings", fmp_api_request("rating", {"symbol": symbol})),
-                ("news", fmp_api_request("stock_news", {"tickers": symbol, "limit": 5})),
-                
-                # Financial statements
-                ("income", fmp_api_request("income-statement", {"symbol": symbol, "period": "annual", "limit": 1})),
-                ("balance", fmp_api_request("balance-sheet-statement", {"symbol": symbol, "period": "annual", "limit": 1})),
-                ("cashflow", fmp_api_request("cash-flow-statement", {"symbol": symbol, "period": "annual", "limit": 1})),
-                ("ratios", fmp_api_request("ratios", {"symbol": symbol, "period": "annual", "limit": 1})),
-                
-                # Ownership and trading data
-                ("insider", fmp_api_request("insider-trading", {"symbol": symbol, "limit": 5})),
-                ("institutional", fmp_api_request("institutional-holder", {"symbol": symbol})),
-                ("short_interest", fmp_api_request("short-interest", {"symbol": symbol, "limit": 1})),
-            ]
-            
-            # Execute all API calls in parallel with individual error handling
-            async def safe_api_call(name, coro):
-                try:
-                    result = await coro
-                    return name, result
-                except Exception as e:
-                    print(f"API call {name} failed: {e}")
-                    return name, None
-            
-            # Run all API calls in parallel
-            print(f"🚀 Fetching data for {symbol} using parallel API calls...")
-            start_time = time.time()
-            
-            results = await asyncio.gather(
-                *[safe_api_call(name, coro) for name, coro in api_calls],
-                return_exceptions=True
-            )
-            
-            end_time = time.time()
-            print(f"⚡ Parallel API calls completed in {end_time - start_time:.2f} seconds")
-            
-            # Extract results into variables
-            profile_data = None
-            quote_data = None
-            historical_data = None
-            rsi_data = None
-            macd_data = None
-            bollinger_data = None
-            stochastic_data = None
-            ratings_data = None
-            news_data = None
-            income_statement = None
-            balance_sheet = None
-            cash_flow = None
-            ratios_data = None
-            insider_trading = None
-            institutional_holders = None
-            short_interest = None
-            
-            for name, result in results:
-                if isinstance(result, Exception):
-                    print(f"Error in {name}: {result}")
-                    continue
-                    
-                if name == "profile":
-                    profile_data = result
-                elif name == "quote":
-                    quote_data = result
-                elif name == "historical":
-                    historical_data = result
-                elif name == "rsi":
-                    rsi_data = result
-                elif name == "macd":
-                    macd_data = result
-                elif name == "bollinger":
-                    bollinger_data = result
-                elif name == "stochastic":
-                    stochastic_data = result
-                elif name == "ratings":
-                    ratings_data = result
-                elif name == "news":
-                    news_data = result
-                elif name == "income":
-                    income_statement = result
-                elif name == "balance":
-                    balance_sheet = result
-                elif name == "cashflow":
-                    cash_flow = result
-                elif name == "ratios":
-                    ratios_data = result
-                elif name == "insider":
-                    insider_trading = result
-                elif name == "institutional":
-                    institutional_holders = result
-                elif name == "short_interest":
-                    short_interest = result
-            
-            # Build title and text content
-            title = f"Stock Information for {symbol}"
-            text_parts = []
-            
-            # Add mandatory analysis instruction
-            text_parts.append("=== IMPORTANT: USE THE EXACT NUMBERS BELOW IN YOUR ANALYSIS ===")
-            text_parts.append("When providing trading recommendations, you MUST reference the specific values provided.")
-            text_parts.append("Do not give generic responses. Use the actual RSI, MACD, price, and volume data shown.")
-            text_parts.append("")
-            
-            # Add profile information
-            if isinstance(profile_data, list) and len(profile_data) > 0:
-                profile = profile_data[0]
-                company_name = profile.get('companyName', 'Unknown')
-                title = f"{company_name} ({symbol})"
-                
-                text_parts.append(f"Company: {company_name}")
-                text_parts.append(f"Symbol: {symbol}")
-                text_parts.append(f"Sector: {profile.get('sector', 'Unknown')}")
-                text_parts.append(f"Industry: {profile.get('industry', 'Unknown')}")
-                text_parts.append(f"CEO: {profile.get('ceo', 'Unknown')}")
-                text_parts.append(f"Website: {profile.get('website', 'N/A')}")
-                text_parts.append(f"Employees: {profile.get('fullTimeEmployees', 'N/A')}")
-                text_parts.append(f"Market Cap: ${profile.get('mktCap', 0):,}")
-                text_parts.append(f"Exchange: {profile.get('exchangeShortName', 'Unknown')}")
-                text_parts.append(f"Country: {profile.get('country', 'Unknown')}")
-                
-                if profile.get('description'):
-                    text_parts.append(f"Description: {profile.get('description')}")
-            
-            # Add quote information with trading analysis format
-            if isinstance(quote_data, list) and len(quote_data) > 0:
-                quote = quote_data[0]
-                current_price = quote.get('price', 0)
-                change_percent = quote.get('changesPercentage', 0)
-                volume = quote.get('volume', 0)
-                avg_volume = quote.get('avgVolume', 0)
-                
-                text_parts.append(f"\n=== TRADING ANALYSIS REQUIRED - USE THESE EXACT NUMBERS ===")
-                text_parts.append(f"CURRENT PRICE: ${current_price}")
-                text_parts.append(f"DAILY CHANGE: {change_percent}%")
-                text_parts.append(f"VOLUME: {volume:,} shares")
-                text_parts.append(f"AVERAGE VOLUME: {avg_volume:,} shares")
-                
-                # Calculate volume ratio for analysis
-                volume_ratio = (volume / avg_volume) if avg_volume > 0 else 1
-                text_parts.append(f"VOLUME RATIO: {volume_ratio:.2f}x average")
-                
-                if volume_ratio > 2.0:
-                    text_parts.append("VOLUME SIGNAL: HIGH VOLUME CONFIRMATION - Strong interest")
-                elif volume_ratio > 1.5:
-                    text_parts.append("VOLUME SIGNAL: Above-average volume - Moderate interest")
-                elif volume_ratio < 0.5:
-                    text_parts.append("VOLUME SIGNAL: Low volume - Lack of conviction")
+        # Prepare date parameters (YYYY-MM-DD) for historical data from a single clock read
+        today = date.today()
+        end_date = today.isoformat()
+        start_date = (today - timedelta(days=5)).isoformat()
+        
+        logger.info("Fetching data for %s using parallel API calls", symbol)
+        start_time = time.time()
+        
+        # Phase 1: core data. If neither profile nor quote knows the symbol, it is
+        # invalid or delisted and the other endpoints are not worth calling.
+        profile_data, quote_data = _drop_failures(await asyncio.gather(
+            fmp_api_request("profile", {"symbol": symbol}),
+            fmp_api_request("quote", {"symbol": symbol}),
+            return_exceptions=True
+        ))
+        profile = _first_or_none(profile_data)
+        quote = _first_or_none(quote_data)
+        if profile is None and quote is None:
+            # Only empty results mean the symbol is unknown; errors (rate limits,
+            # network failures, a bad API key) say nothing about the symbol
+            if profile_data != [] or quote_data != []:
+                error = next((data for data in (profile_data, quote_data)
+                              if isinstance(data, dict) and "error" in data), None)
+                raise ValueError(error.get('message', error['error']) if error is not None
+                                 else "No profile or quote data returned")
+            return {
+                "id": id,
+                "title": f"Unknown symbol {symbol}",
+                "text": "No data available",
+                "url": _COMPANY_URL + symbol,
+                "metadata": None
+            }
+        
+        # Phase 2: everything else, in parallel
+        (
+            historical_data, rsi_data, macd_data, bollinger_data, stochastic_data,
+            ratings_data, news_data, income_statement, balance_sheet, cash_flow,
+            ratios_data, insider_trading, institutional_holders, short_interest
+        ) = _drop_failures(await asyncio.gather(
+            # Technical analysis data
+            fmp_api_request("historical-price-full", {"symbol": symbol, "from": start_date, "to": end_date}),
+            fmp_api_request("rsi", {"symbol": symbol, "period": 14}),
+            fmp_api_request("macd", {"symbol": symbol}),
+            fmp_api_request("bbands", {"symbol": symbol, "period": 20}),
+            fmp_api_request("stoch", {"symbol": symbol}),
+            
+            # Analyst and news data
+            fmp_api_request("rating", {"symbol": symbol}),
+            fmp_api_request("stock_news", {"tickers": symbol, "limit": 5}),
+            
+            # Financial statements
+            fmp_api_request("income-statement", {"symbol": symbol, "period": "annual", "limit": 1}),
+            fmp_api_request("balance-sheet-statement", {"symbol": symbol, "period": "annual", "limit": 1}),
+            fmp_api_request("cash-flow-statement", {"symbol": symbol, "period": "annual", "limit": 1}),
+            fmp_api_request("ratios", {"symbol": symbol, "period": "annual", "limit": 1}),
+            
+            # Ownership and trading data
+            fmp_api_request("insider-trading", {"symbol": symbol, "limit": 5}),
+            fmp_api_request("institutional-holder", {"symbol": symbol}),
+            fmp_api_request("short-interest", {"symbol": symbol, "limit": 1}),
+            return_exceptions=True
+        ))
+        
+        end_time = time.time()
+        logger.info("Parallel API calls completed in %.2f seconds", end_time - start_time)
+        
+        # Latest record of each list response, or None if it is missing or empty
+        latest_rsi = _first_or_none(rsi_data)
+        latest_macd = _first_or_none(macd_data)
+        latest_bb = _first_or_none(bollinger_data)
+        latest_stoch = _first_or_none(stochastic_data)
+        latest_rating = _first_or_none(ratings_data)
+        income = _first_or_none(income_statement)
+        ratios = _first_or_none(ratios_data)
+        short_data = _first_or_none(short_interest)
+        
+        # Build title, text content and metadata together, one block per data source
+        title = f"Stock Information for {symbol}"
+        text_parts = []
+        metadata = {}
+        
+        # Add mandatory analysis instruction
+        text_parts.append(_FETCH_INSTRUCTIONS)
+        
+        # Add profile information
+        if profile is not None:
+            title = f"{profile.get('companyName', 'Unknown')} ({symbol})"
+            text_parts.extend(_profile_lines(profile, symbol))
+            metadata.update(_pick(profile, _PROFILE_METADATA))
+            metadata["currency"] = profile.get('currency', 'USD')
+            metadata["is_etf"] = profile.get('isEtf', False)
+        
+        # Add quote information with trading analysis format
+        if quote is not None:
+            text_parts.extend(_quote_lines(quote))
+            metadata.update(_pick(quote, _QUOTE_METADATA))
+        
+        # Add technical indicators with forced analysis
+        if latest_rsi is not None:
+            text_parts.append("\n=== TECHNICAL INDICATORS - CITE THESE EXACT VALUES ===")
+            rsi_val = latest_rsi.get('rsi', 'N/A')
+            text_parts.append(f"RSI (14-period): {rsi_val}")
+            
+            if rsi_val != 'N/A':
+                rsi_float = float(rsi_val)
+                if rsi_float > 75:
+                    text_parts.append(f"RSI SIGNAL: EXTREMELY OVERBOUGHT at {rsi_float:.1f} - Consider selling pressure")
+                elif rsi_float > 70:
+                    text_parts.append(f"RSI SIGNAL: OVERBOUGHT at {rsi_float:.1f} - Caution on new longs")
+                elif rsi_float < 25:
+                    text_parts.append(f"RSI SIGNAL: EXTREMELY OVERSOLD at {rsi_float:.1f} - Potential bounce")
+                elif rsi_float < 30:
+                    text_parts.append(f"RSI SIGNAL: OVERSOLD at {rsi_float:.1f} - Support expected")
                 else:
-                    text_parts.append("VOLUME SIGNAL: Normal volume levels")
-                
-                text_parts.append(f"\nDay Range: ${quote.get('dayLow', 0)} - ${quote.get('dayHigh', 0)}")
-                text_parts.append(f"52-Week Range: ${quote.get('yearLow', 0)} - ${quote.get('yearHigh', 0)}")
-                text_parts.append(f"P/E Ratio: {quote.get('pe', 'N/A')}")
-                text_parts.append(f"EPS: ${quote.get('eps', 0)}")
-                text_parts.append(f"Market Cap: ${quote.get('marketCap', 0):,}")
-                text_parts.append(f"Beta: {quote.get('beta', 'N/A')}")
-                text_parts.append(f"Last Update: {quote.get('timestamp', 'N/A')}")
+                    text_parts.append(f"RSI SIGNAL: NEUTRAL at {rsi_float:.1f} - No extreme reading")
             
-            # Add technical indicators with forced analysis
-            if rsi_data and isinstance(rsi_data, list) and len(rsi_data) > 0:
-                text_parts.append(f"\n=== TECHNICAL INDICATORS - CITE THESE EXACT VALUES ===")
-                latest_rsi = rsi_data[0]
-                rsi_val = latest_rsi.get('rsi', 'N/A')
-                text_parts.append(f"RSI (14-period): {rsi_val}")
+            metadata["rsi"] = latest_rsi.get('rsi')
+            if latest_rsi.get('rsi'):
+                rsi_float = float(latest_rsi['rsi'])
+                metadata["rsi_signal"] = _RSI_LABELS[(rsi_float >= 30) + (rsi_float > 70)]
+        
+        if latest_macd is not None:
+            macd_line = latest_macd.get('macd', 'N/A')
+            signal_line = latest_macd.get('signal', 'N/A')
+            histogram = latest_macd.get('histogram', 'N/A')
+            
+            text_parts.append(f"MACD LINE: {macd_line}")
+            text_parts.append(f"MACD SIGNAL LINE: {signal_line}")
+            text_parts.append(f"MACD HISTOGRAM: {histogram}")
+            
+            if macd_line != 'N/A' and signal_line != 'N/A':
+                macd_float = float(macd_line)
+                signal_float = float(signal_line)
                 
-                if rsi_val != 'N/A':
-                    rsi_float = float(rsi_val)
-                    if rsi_float > 75:
-                        text_parts.append(f"RSI SIGNAL: EXTREMELY OVERBOUGHT at {rsi_float:.1f} - Consider selling pressure")
-                    elif rsi_float > 70:
-                        text_parts.append(f"RSI SIGNAL: OVERBOUGHT at {rsi_float:.1f} - Caution on new longs")
-                    elif rsi_float < 25:
-                        text_parts.append(f"RSI SIGNAL: EXTREMELY OVERSOLD at {rsi_float:.1f} - Potential bounce")
-                    elif rsi_float < 30:
-                        text_parts.append(f"RSI SIGNAL: OVERSOLD at {rsi_float:.1f} - Support expected")
-                    else:
-                        text_parts.append(f"RSI SIGNAL: NEUTRAL at {rsi_float:.1f} - No extreme reading")
+                if macd_float > signal_float:
+                    text_parts.append(f"MACD SIGNAL: BULLISH - MACD ({macd_float:.4f}) above Signal ({signal_float:.4f})")
+                else:
+                    text_parts.append(f"MACD SIGNAL: BEARISH - MACD ({macd_float:.4f}) below Signal ({signal_float:.4f})")
             
-            if macd_data and isinstance(macd_data, list) and len(macd_data) > 0:
-                latest_macd = macd_data[0]
-                macd_line = latest_macd.get('macd', 'N/A')
-                signal_line = latest_macd.get('signal', 'N/A')
-                histogram = latest_macd.get('histogram', 'N/A')
-                
-                text_parts.append(f"MACD LINE: {macd_line}")
-                text_parts.append(f"MACD SIGNAL LINE: {signal_line}")
-                text_parts.append(f"MACD HISTOGRAM: {histogram}")
-                
-                if macd_line != 'N/A' and signal_line != 'N/A':
-                    macd_float = float(macd_line)
-                    signal_float = float(signal_line)
-                    
-                    if macd_float > signal_float:
-                        text_parts.append(f"MACD SIGNAL: BULLISH - MACD ({macd_float:.4f}) above Signal ({signal_float:.4f})")
-                    else:
-                        text_parts.append(f"MACD SIGNAL: BEARISH - MACD ({macd_float:.4f}) below Signal ({signal_float:.4f})")
+            metadata.update(_pick(latest_macd, _MACD_METADATA))
+        
+        if latest_bb is not None:
+            bb_upper = latest_bb.get('upperBand', 'N/A')
+            bb_middle = latest_bb.get('middleBand', 'N/A') 
+            bb_lower = latest_bb.get('lowerBand', 'N/A')
             
-            if bollinger_data and isinstance(bollinger_data, list) and len(bollinger_data) > 0 and quote_data:
-                latest_bb = bollinger_data[0]
-                bb_upper = latest_bb.get('upperBand', 'N/A')
-                bb_middle = latest_bb.get('middleBand', 'N/A') 
-                bb_lower = latest_bb.get('lowerBand', 'N/A')
-                current_price = quote_data[0].get('price', 0)
+            # The band comparison needs the current price
+            if quote is not None:
+                current_price = quote.get('price', 0)
                 
                 text_parts.append(f"BOLLINGER UPPER BAND: ${bb_upper}")
                 text_parts.append(f"BOLLINGER MIDDLE BAND: ${bb_middle}")
@@ -460,314 +672,182 @@ async def fetch(id: str) -> Dict[str, Any]:
                     else:
                         text_parts.append(f"BOLLINGER SIGNAL: WITHIN BANDS - Price between ${bb_lower_float} and ${bb_upper_float}")
             
-            if stochastic_data and isinstance(stochastic_data, list) and len(stochastic_data) > 0:
-                latest_stoch = stochastic_data[0]
-                k_value = latest_stoch.get('k', 'N/A')
-                d_value = latest_stoch.get('d', 'N/A')
-                text_parts.append(f"STOCHASTIC %K: {k_value}")
-                text_parts.append(f"STOCHASTIC %D: {d_value}")
-                
-                if k_value != 'N/A':
-                    k_float = float(k_value)
-                    if k_float > 80:
-                        text_parts.append(f"STOCHASTIC SIGNAL: OVERBOUGHT at {k_float:.1f}")
-                    elif k_float < 20:
-                        text_parts.append(f"STOCHASTIC SIGNAL: OVERSOLD at {k_float:.1f}")
-                    else:
-                        text_parts.append(f"STOCHASTIC SIGNAL: NEUTRAL at {k_float:.1f}")
-            
-            # Add analyst ratings
-            if ratings_data and isinstance(ratings_data, list) and len(ratings_data) > 0:
-                text_parts.append(f"\\n=== ANALYST RATINGS ===")
-                latest_rating = ratings_data[0]
-                text_parts.append(f"Rating: {latest_rating.get('rating', 'N/A')}")
-                text_parts.append(f"Target Price: ${latest_rating.get('targetPrice', 'N/A')}")
-                text_parts.append(f"Rating Date: {latest_rating.get('date', 'N/A')}")
-            
-            # Add recent news for sentiment
-            if news_data and isinstance(news_data, list) and len(news_data) > 0:
-                text_parts.append(f"\\n=== RECENT NEWS & SENTIMENT ===")
-                for i, article in enumerate(news_data[:3]):  # Show top 3 news items
-                    text_parts.append(f"News {i+1}: {article.get('title', 'N/A')}")
-                    text_parts.append(f"Date: {article.get('publishedDate', 'N/A')}")
-                    text_parts.append(f"Source: {article.get('site', 'N/A')}")
-                    if article.get('text'):
-                        # Truncate long text
-                        text = article['text'][:200] + "..." if len(article['text']) > 200 else article['text']
-                        text_parts.append(f"Summary: {text}")
-                    text_parts.append("")
-            
-            # Add price action analysis
-            if historical_data and isinstance(historical_data, dict) and 'historical' in historical_data:
-                text_parts.append(f"\\n=== PRICE ACTION ANALYSIS ===")
-                historical = historical_data['historical']
-                if len(historical) >= 5:
-                    # Get last 5 days of data
-                    recent_prices = historical[:5]
-                    prices = [float(day['close']) for day in recent_prices]
-                    
-                    # Calculate price momentum
-                    if len(prices) >= 2:
-                        price_change = prices[0] - prices[-1]
-                        price_change_pct = (price_change / prices[-1]) * 100
-                        text_parts.append(f"5-Day Price Change: ${price_change:.2f} ({price_change_pct:.2f}%)")
-                        
-                        # Determine trend
-                        if price_change_pct > 2:
-                            text_parts.append("Short-term Trend: Bullish (>2% gain)")
-                        elif price_change_pct < -2:
-                            text_parts.append("Short-term Trend: Bearish (>2% loss)")
-                        else:
-                            text_parts.append("Short-term Trend: Sideways")
-                    
-                    # Add recent daily data
-                    text_parts.append("Recent Daily Prices:")
-                    for i, day in enumerate(recent_prices[:3]):
-                        text_parts.append(f"  {day['date']}: Open ${day['open']}, High ${day['high']}, Low ${day['low']}, Close ${day['close']}")
-            
-            # Add fundamental analysis
-            if income_statement and isinstance(income_statement, list) and len(income_statement) > 0:
-                text_parts.append(f"\\n=== FUNDAMENTAL ANALYSIS ===")
-                income = income_statement[0]
-                text_parts.append(f"Revenue (TTM): ${income.get('revenue', 0):,}")
-                text_parts.append(f"Net Income (TTM): ${income.get('netIncome', 0):,}")
-                text_parts.append(f"Gross Profit (TTM): ${income.get('grossProfit', 0):,}")
-                text_parts.append(f"Operating Income (TTM): ${income.get('operatingIncome', 0):,}")
-                text_parts.append(f"EBITDA (TTM): ${income.get('ebitda', 0):,}")
-            
-            if ratios_data and isinstance(ratios_data, list) and len(ratios_data) > 0:
-                ratios = ratios_data[0]
-                text_parts.append(f"\\n=== KEY FINANCIAL RATIOS ===")
-                text_parts.append(f"Return on Equity (ROE): {ratios.get('returnOnEquity', 'N/A')}")
-                text_parts.append(f"Return on Assets (ROA): {ratios.get('returnOnAssets', 'N/A')}")
-                text_parts.append(f"Debt-to-Equity: {ratios.get('debtEquityRatio', 'N/A')}")
-                text_parts.append(f"Current Ratio: {ratios.get('currentRatio', 'N/A')}")
-                text_parts.append(f"Quick Ratio: {ratios.get('quickRatio', 'N/A')}")
-                text_parts.append(f"Price-to-Book: {ratios.get('priceToBookRatio', 'N/A')}")
-                text_parts.append(f"Price-to-Sales: {ratios.get('priceToSalesRatio', 'N/A')}")
-            
-            # Add insider trading activity
-            if insider_trading and isinstance(insider_trading, list) and len(insider_trading) > 0:
-                text_parts.append(f"\\n=== INSIDER TRADING ACTIVITY ===")
-                for i, trade in enumerate(insider_trading[:3]):
-                    text_parts.append(f"Insider Trade {i+1}:")
-                    text_parts.append(f"  Name: {trade.get('filingName', 'N/A')}")
-                    text_parts.append(f"  Type: {trade.get('transactionType', 'N/A')}")
-                    text_parts.append(f"  Shares: {trade.get('shares', 'N/A')}")
-                    text_parts.append(f"  Price: ${trade.get('price', 'N/A')}")
-                    text_parts.append(f"  Date: {trade.get('filingDate', 'N/A')}")
-                    text_parts.append("")
-            
-            # Add institutional ownership
-            if institutional_holders and isinstance(institutional_holders, list) and len(institutional_holders) > 0:
-                text_parts.append(f"\\n=== INSTITUTIONAL OWNERSHIP ===")
-                total_shares = sum(float(holder.get('shares', 0)) for holder in institutional_holders)
-                for i, holder in enumerate(institutional_holders[:5]):
-                    shares = float(holder.get('shares', 0))
-                    percentage = (shares / total_shares * 100) if total_shares > 0 else 0
-                    text_parts.append(f"{i+1}. {holder.get('holder', 'N/A')}: {shares:,.0f} shares ({percentage:.1f}%)")
-            
-            # Add short interest data
-            if short_interest and isinstance(short_interest, list) and len(short_interest) > 0:
-                text_parts.append(f"\\n=== SHORT INTEREST ===")
-                short_data = short_interest[0]
-                text_parts.append(f"Short Interest: {short_data.get('shortInterest', 'N/A')}")
-                text_parts.append(f"Short Interest %: {short_data.get('shortInterestPercent', 'N/A')}")
-                text_parts.append(f"Days to Cover: {short_data.get('daysToCover', 'N/A')}")
-                text_parts.append(f"Short Interest Date: {short_data.get('date', 'N/A')}")
-            
-            # Add trading decision prompt at the end
-            text_parts.append("\n=== TRADING DECISION REQUIRED ===")
-            text_parts.append("Based on the EXACT numbers above, you must provide:")
-            text_parts.append("1. Decision: Trade, Monitor, or Ignore")
-            text_parts.append("2. Cite specific RSI value, MACD values, volume ratio, and price levels")
-            text_parts.append("3. Reference the actual numbers in your analysis")
-            text_parts.append("4. Example: 'Trade - RSI at 25.4 shows oversold, MACD at -0.45 below signal -0.32, volume 2.3x average confirms interest'")
-            
-            # Add comprehensive data sections
-            text_parts.append(f"\n=== ANALYST RATINGS ===")
-            text_parts.append("Rating: B+ (3/5) - Outperform")
-            text_parts.append("Component Scores: DCF(4/5), ROE(5/5), ROA(5/5), Debt/Equity(1/5), P/E(2/5), P/B(1/5)")
-            text_parts.append("Strong fundamentals with excellent ROE/ROA but high valuation concerns")
-            
-            text_parts.append(f"\n=== EXPONENTIAL MOVING AVERAGE (EMA) ===")
-            text_parts.append("10-Day EMA: $235.71")
-            text_parts.append("Current Price: $237.88")
-            text_parts.append("EMA SIGNAL: BULLISH - Price above EMA ($237.88 > $235.71)")
-            text_parts.append("Recent trend shows price recovery from $226.79 low")
-            
-            text_parts.append(f"\n=== ANALYST FINANCIAL ESTIMATES ===")
-            text_parts.append("2025 Revenue Estimate: $414.99B (consensus)")
-            text_parts.append("2025 EPS Estimate: $7.37 (consensus)")
-            text_parts.append("2025 Net Income Estimate: $113.01B (consensus)")
-            text_parts.append("Growth trajectory shows steady increases through 2029")
-            
-            text_parts.append(f"\n=== ANALYST PRICE TARGETS ===")
-            text_parts.append("Melius Research: $290 (+26.54% upside)")
-            text_parts.append("D.A. Davidson: $250 (+21.74% upside)")
-            text_parts.append("J.P. Morgan: $230 (+1.26% upside)")
-            text_parts.append("Morgan Stanley: $240 (+1.26% upside)")
-            text_parts.append("HSBC: $220 (-8.21% downside)")
-            text_parts.append("Average Target: ~$230-240 range")
-            
-            text_parts.append(f"\n=== DIVIDEND INFORMATION ===")
-            text_parts.append("Current Yield: 0.45%")
-            text_parts.append("Latest Dividend: $0.26 (quarterly)")
-            text_parts.append("Frequency: Quarterly")
-            text_parts.append("Dividend Growth: Consistent increases from $0.24 to $0.26")
-            text_parts.append("Recent Payments: Aug 2025 ($0.26), May 2025 ($0.26), Feb 2025 ($0.25)")
-            
-            # Combine all text
-            full_text = "\n".join(text_parts) if text_parts else "No information available"
-            
-            # Build metadata with comprehensive trading data
-            metadata = {}
-            if isinstance(profile_data, list) and len(profile_data) > 0:
-                profile = profile_data[0]
-                metadata.update({
-                    "sector": profile.get('sector'),
-                    "industry": profile.get('industry'),
-                    "exchange": profile.get('exchangeShortName'),
-                    "currency": profile.get('currency', 'USD'),
-                    "country": profile.get('country'),
-                    "is_etf": profile.get('isEtf', False),
-                    "beta": profile.get('beta'),
-                    "market_cap": profile.get('mktCap')
-                })
-            
-            if isinstance(quote_data, list) and len(quote_data) > 0:
-                quote = quote_data[0]
-                metadata.update({
-                    "current_price": quote.get('price'),
-                    "price_change": quote.get('change'),
-                    "price_change_percent": quote.get('changesPercentage'),
-                    "day_high": quote.get('dayHigh'),
-                    "day_low": quote.get('dayLow'),
-                    "year_high": quote.get('yearHigh'),
-                    "year_low": quote.get('yearLow'),
-                    "volume": quote.get('volume'),
-                    "avg_volume": quote.get('avgVolume'),
-                    "pe_ratio": quote.get('pe'),
-                    "eps": quote.get('eps'),
-                    "market_cap": quote.get('marketCap')
-                })
-            
-            # Add technical indicators to metadata
-            if rsi_data and isinstance(rsi_data, list) and len(rsi_data) > 0:
-                latest_rsi = rsi_data[0]
-                metadata["rsi"] = latest_rsi.get('rsi')
-                if latest_rsi.get('rsi'):
-                    rsi_val = float(latest_rsi['rsi'])
-                    if rsi_val > 70:
-                        metadata["rsi_signal"] = "overbought"
-                    elif rsi_val < 30:
-                        metadata["rsi_signal"] = "oversold"
-                    else:
-                        metadata["rsi_signal"] = "neutral"
-            
-            if macd_data and isinstance(macd_data, list) and len(macd_data) > 0:
-                latest_macd = macd_data[0]
-                metadata.update({
-                    "macd": latest_macd.get('macd'),
-                    "macd_signal": latest_macd.get('signal'),
-                    "macd_histogram": latest_macd.get('histogram')
-                })
-            
-            if bollinger_data and isinstance(bollinger_data, list) and len(bollinger_data) > 0:
-                latest_bb = bollinger_data[0]
-                metadata.update({
-                    "bollinger_upper": latest_bb.get('upperBand'),
-                    "bollinger_middle": latest_bb.get('middleBand'),
-                    "bollinger_lower": latest_bb.get('lowerBand')
-                })
-            
-            if stochastic_data and isinstance(stochastic_data, list) and len(stochastic_data) > 0:
-                latest_stoch = stochastic_data[0]
-                metadata.update({
-                    "stochastic_k": latest_stoch.get('k'),
-                    "stochastic_d": latest_stoch.get('d')
-                })
-            
-            # Add analyst rating to metadata
-            if ratings_data and isinstance(ratings_data, list) and len(ratings_data) > 0:
-                latest_rating = ratings_data[0]
-                metadata.update({
-                    "analyst_rating": latest_rating.get('rating'),
-                    "target_price": latest_rating.get('targetPrice'),
-                    "rating_date": latest_rating.get('date')
-                })
-            
-            # Add price action analysis to metadata
-            if historical_data and isinstance(historical_data, dict) and 'historical' in historical_data:
-                historical = historical_data['historical']
-                if len(historical) >= 5:
-                    recent_prices = historical[:5]
-                    prices = [float(day['close']) for day in recent_prices]
-                    if len(prices) >= 2:
-                        price_change = prices[0] - prices[-1]
-                        price_change_pct = (price_change / prices[-1]) * 100
-                        metadata.update({
-                            "five_day_change": price_change,
-                            "five_day_change_percent": price_change_pct,
-                            "short_term_trend": "bullish" if price_change_pct > 2 else "bearish" if price_change_pct < -2 else "sideways"
-                        })
-            
-            # Add fundamental analysis to metadata
-            if income_statement and isinstance(income_statement, list) and len(income_statement) > 0:
-                income = income_statement[0]
-                metadata.update({
-                    "revenue_ttm": income.get('revenue'),
-                    "net_income_ttm": income.get('netIncome'),
-                    "gross_profit_ttm": income.get('grossProfit'),
-                    "operating_income_ttm": income.get('operatingIncome'),
-                    "ebitda_ttm": income.get('ebitda')
-                })
-            
-            if ratios_data and isinstance(ratios_data, list) and len(ratios_data) > 0:
-                ratios = ratios_data[0]
-                metadata.update({
-                    "roe": ratios.get('returnOnEquity'),
-                    "roa": ratios.get('returnOnAssets'),
-                    "debt_to_equity": ratios.get('debtEquityRatio'),
-                    "current_ratio": ratios.get('currentRatio'),
-                    "quick_ratio": ratios.get('quickRatio'),
-                    "price_to_book": ratios.get('priceToBookRatio'),
-                    "price_to_sales": ratios.get('priceToSalesRatio')
-                })
-            
-            # Add insider trading to metadata
-            if insider_trading and isinstance(insider_trading, list) and len(insider_trading) > 0:
-                recent_trades = insider_trading[:3]
-                metadata["recent_insider_trades"] = len(recent_trades)
-                metadata["latest_insider_trade_date"] = recent_trades[0].get('filingDate') if recent_trades else None
-            
-            # Add institutional ownership to metadata
-            if institutional_holders and isinstance(institutional_holders, list) and len(institutional_holders) > 0:
-                total_shares = sum(float(holder.get('shares', 0)) for holder in institutional_holders)
-                metadata.update({
-                    "institutional_holders_count": len(institutional_holders),
-                    "total_institutional_shares": total_shares
-                })
+            metadata.update(_pick(latest_bb, _BOLLINGER_METADATA))
+        
+        if latest_stoch is not None:
+            k_value = latest_stoch.get('k', 'N/A')
+            d_value = latest_stoch.get('d', 'N/A')
+            text_parts.append(f"STOCHASTIC %K: {k_value}")
+            text_parts.append(f"STOCHASTIC %D: {d_value}")
+            
+            if k_value != 'N/A':
+                k_float = float(k_value)
+                if k_float > 80:
+                    text_parts.append(f"STOCHASTIC SIGNAL: OVERBOUGHT at {k_float:.1f}")
+                elif k_float < 20:
+                    text_parts.append(f"STOCHASTIC SIGNAL: OVERSOLD at {k_float:.1f}")
+                else:
+                    text_parts.append(f"STOCHASTIC SIGNAL: NEUTRAL at {k_float:.1f}")
             
-            # Add short interest to metadata
-            if short_interest and isinstance(short_interest, list) and len(short_interest) > 0:
-                short_data = short_interest[0]
+            metadata.update(_pick(latest_stoch, _STOCHASTIC_METADATA))
+        
+        # Add analyst ratings
+        if latest_rating is not None:
+            text_parts.append(
+                "\n=== ANALYST RATINGS ===\n"
+                f"Rating: {latest_rating.get('rating', 'N/A')}\n"
+                f"Target Price: ${latest_rating.get('targetPrice', 'N/A')}\n"
+                f"Rating Date: {latest_rating.get('date', 'N/A')}"
+            )
+            metadata.update(_pick(latest_rating, _RATING_METADATA))
+        
+        # Add recent news for sentiment
+        if isinstance(news_data, list) and news_data:
+            text_parts.append("\n=== RECENT NEWS & SENTIMENT ===")
+            for i, article in enumerate(itertools.islice(news_data, 3)):  # Show top 3 news items
+                summary = f"Summary: {_truncate(article['text'], 200)}\n" if article.get('text') else ""
+                text_parts.append(
+                    f"News {i+1}: {article.get('title', 'N/A')}\n"
+                    f"Date: {article.get('publishedDate', 'N/A')}\n"
+                    f"Source: {article.get('site', 'N/A')}\n"
+                    f"{summary}"
+                )
+        
+        # Add price action analysis
+        if historical_data and isinstance(historical_data, dict) and 'historical' in historical_data:
+            text_parts.append("\n=== PRICE ACTION ANALYSIS ===")
+            historical = historical_data['historical']
+            if len(historical) >= 5:
+                # Calculate 5-day price momentum from the newest and oldest close
+                latest_close = float(historical[0]['close'])
+                oldest_close = float(historical[4]['close'])
+                price_change = latest_close - oldest_close
+                price_change_pct = (price_change / oldest_close) * 100
+                text_parts.append(f"5-Day Price Change: ${price_change:.2f} ({price_change_pct:.2f}%)")
+                
+                # Determine trend
+                if price_change_pct > 2:
+                    text_parts.append("Short-term Trend: Bullish (>2% gain)")
+                elif price_change_pct < -2:
+                    text_parts.append("Short-term Trend: Bearish (>2% loss)")
+                else:
+                    text_parts.append("Short-term Trend: Sideways")
+                
                 metadata.update({
-                    "short_interest": short_data.get('shortInterest'),
-                    "short_interest_percent": short_data.get('shortInterestPercent'),
-                    "days_to_cover": short_data.get('daysToCover')
+                    "five_day_change": price_change,
+                    "five_day_change_percent": price_change_pct,
+                    "short_term_trend": "bullish" if price_change_pct > 2 else "bearish" if price_change_pct < -2 else "sideways"
                 })
-            
-            return {
-                "id": id,
-                "title": title,
-                "text": full_text,
-                "url": f"https://financialmodelingprep.com/company/{symbol}",
-                "metadata": metadata if metadata else None
-            }
+                
+                # Add recent daily data
+                text_parts.append("Recent Daily Prices:")
+                for day in itertools.islice(historical, 3):
+                    text_parts.append(f"  {day['date']}: Open ${day['open']}, High ${day['high']}, Low ${day['low']}, Close ${day['close']}")
         
-        else:
-            raise ValueError(f"Unknown resource type: {id}")
-            
+        # Add fundamental analysis
+        if income is not None:
+            text_parts.append(
+                "\n=== FUNDAMENTAL ANALYSIS ===\n"
+                f"Revenue (TTM): ${income.get('revenue', 0):,}\n"
+                f"Net Income (TTM): ${income.get('netIncome', 0):,}\n"
+                f"Gross Profit (TTM): ${income.get('grossProfit', 0):,}\n"
+                f"Operating Income (TTM): ${income.get('operatingIncome', 0):,}\n"
+                f"EBITDA (TTM): ${income.get('ebitda', 0):,}"
+            )
+            metadata.update(_pick(income, _INCOME_METADATA))
+        
+        if ratios is not None:
+            text_parts.append(
+                "\n=== KEY FINANCIAL RATIOS ===\n"
+                f"Return on Equity (ROE): {ratios.get('returnOnEquity', 'N/A')}\n"
+                f"Return on Assets (ROA): {ratios.get('returnOnAssets', 'N/A')}\n"
+                f"Debt-to-Equity: {ratios.get('debtEquityRatio', 'N/A')}\n"
+                f"Current Ratio: {ratios.get('currentRatio', 'N/A')}\n"
+                f"Quick Ratio: {ratios.get('quickRatio', 'N/A')}\n"
+                f"Price-to-Book: {ratios.get('priceToBookRatio', 'N/A')}\n"
+                f"Price-to-Sales: {ratios.get('priceToSalesRatio', 'N/A')}"
+            )
+            metadata.update(_pick(ratios, _RATIOS_METADATA))
+        
+        # Add insider trading activity
+        if isinstance(insider_trading, list) and insider_trading:
+            text_parts.append("\n=== INSIDER TRADING ACTIVITY ===")
+            for i, trade in enumerate(itertools.islice(insider_trading, 3)):
+                text_parts.append(
+                    f"Insider Trade {i+1}:\n"
+                    f"  Name: {trade.get('filingName', 'N/A')}\n"
+                    f"  Type: {trade.get('transactionType', 'N/A')}\n"
+                    f"  Shares: {trade.get('shares', 'N/A')}\n"
+                    f"  Price: ${trade.get('price', 'N/A')}\n"
+                    f"  Date: {trade.get('filingDate', 'N/A')}\n"
+                )
+            metadata["recent_insider_trades"] = min(len(insider_trading), 3)
+            metadata["latest_insider_trade_date"] = insider_trading[0].get('filingDate')
+        
+        # Add institutional ownership
+        if isinstance(institutional_holders, list) and institutional_holders:
+            text_parts.append("\n=== INSTITUTIONAL OWNERSHIP ===")
+            # Parse each holder's shares once; the top 5 reuse the parsed values
+            holder_shares = [float(holder.get('shares', 0)) for holder in institutional_holders]
+            total_shares = sum(holder_shares)
+            for i, (holder, shares) in enumerate(itertools.islice(zip(institutional_holders, holder_shares), 5)):
+                percentage = (shares / total_shares * 100) if total_shares > 0 else 0
+                text_parts.append(f"{i+1}. {holder.get('holder', 'N/A')}: {shares:,.0f} shares ({percentage:.1f}%)")
+            metadata.update({
+                "institutional_holders_count": len(institutional_holders),
+                "total_institutional_shares": total_shares
+            })
+        
+        # Add short interest data
+        if short_data is not None:
+            text_parts.append(
+                "\n=== SHORT INTEREST ===\n"
+                f"Short Interest: {short_data.get('shortInterest', 'N/A')}\n"
+                f"Short Interest %: {short_data.get('shortInterestPercent', 'N/A')}\n"
+                f"Days to Cover: {short_data.get('daysToCover', 'N/A')}\n"
+                f"Short Interest Date: {short_data.get('date', 'N/A')}"
+            )
+            metadata.update(_pick(short_data, _SHORT_INTEREST_METADATA))
+        
+        # Add trading decision prompt and reference sections at the end
+        text_parts.append(_FETCH_CLOSING_SECTIONS)
+        
+        # Combine all text
+        full_text = "\n".join(text_parts) if text_parts else "No information available"
+        
+        return {
+            "id": id,
+            "title": title,
+            "text": full_text,
+            "url": _COMPANY_URL + symbol,
+            "metadata": metadata if metadata else None
+        }
+    
     except Exception as e:
         raise ValueError(f"Fetch failed: {str(e)}")
+
+
+async def fetch_many(ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Fetch detailed information for several resources at once.
+    
+    The fetches run concurrently, so their quote requests are combined into
+    batch requests by the API client and shared requests are made only once.
+    
+    Args:
+        ids: Resource IDs in format "stock-{symbol}"
+        
+    Returns:
+        One fetch result per ID, in the same order. An ID that fails to fetch
+        yields a dictionary with its id and an error message instead.
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    fetched = await asyncio.gather(*(fetch(id) for id in unique_ids), return_exceptions=True)
+    
+    results = {}
+    for id, result in zip(unique_ids, fetched):
+        if isinstance(result, Exception):
+            result = {"id": id, "error": str(result)}
+        results[id] = result
+    
+    return [results[id] for id in ids]
@@ -3,18 +3,74 @@ Financial statement-related tools for the FMP MCP server
 
 This module contains tools related to the Financial Statements section of the Financial Modeling Prep API
 """
+import re
+from functools import lru_cache
 from typing import Dict, Any, Optional, List, Union
 
 from src.api.client import fmp_api_request
 
+# Shape of a ticker symbol (e.g. AAPL, BRK.B, ^GSPC, BTCUSD, GC=F); tools reject
+# anything else before it costs a network round trip
+SYMBOL_RE = re.compile(r"\^?[A-Za-z0-9][A-Za-z0-9.\-=]{0,14}")
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _format_int(value: int) -> str:
+    """
+    Cached formatting for integers; volumes and market caps repeat a lot
+    
+    Only integers are cached: equal floats (0.0 and -0.0) can format differently.
+    """
+    return f"{value:,}"
+
+
 # Helper function for formatting numbers with commas
 def format_number(value: Any) -> str:
     """Format a number with commas, or return as-is if not a number"""
-    if isinstance(value, (int, float)):
+    # 'N/A' and other strings are the most common case and need no work
+    if type(value) is str:
+        return value
+    if isinstance(value, int):
+        return _format_int(value)
+    if isinstance(value, float):
         return f"{value:,}"
     return str(value)
 
 
+# Direction emojis for negative, flat and positive changes (🔻, ➖, 🔺), written
+# as escape sequences so re-encoding the source cannot corrupt them
+_EMOJI = ("\U0001F53B", "\u2796", "\U0001F53A")
+
+
+def direction_emoji(change: float) -> str:
+    """Get the emoji showing the direction of a price change"""
+    return _EMOJI[(change > 0) - (change < 0) + 1]
+
+
+def response_error(data: Any, description: str, symbol: Optional[str] = None) -> Optional[str]:
+    """
+    Check an API response before any formatting work is done
+    
+    Args:
+        data: Response returned by fmp_api_request
+        description: Lowercase description of the data used in the messages
+        symbol: Ticker symbol that was requested, if the request was for one symbol
+        
+    Returns:
+        An error or empty-result message, or None if the data can be formatted
+    """
+    if type(data) is list and data:
+        return None
+    
+    if isinstance(data, dict) and "error" in data:
+        subject = description if symbol is None else f"{description} for {symbol}"
+        return f"Error fetching {subject}: {data.get('message', 'Unknown error')}"
+    
+    if symbol is None:
+        return f"No data found for {description}"
+    return f"No {description} data found for symbol {symbol}"
+
+
 async def get_income_statement(symbol: str, period: str = "annual", limit: int = 1) -> str:
     """
     Get income statement for a company
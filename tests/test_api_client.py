@@ -1,10 +1,11 @@
 """
 Tests for the FMP API client
 """
+import asyncio
 import pytest
 import httpx
 import json
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
 # Import module to test (will be created in implementation phase)
 # from src.api.client import fmp_api_request
@@ -24,20 +25,17 @@ async def test_fmp_api_request_successful(mock_api_key, mock_company_profile_res
     
     # Create a mock response
     mock_resp = AsyncMock()
-    mock_resp.json = lambda: profile_data
+    mock_resp.content = json.dumps(profile_data).encode()
     mock_resp.raise_for_status = lambda: None
     
     # Mock the client's get method
     mock_client = AsyncMock()
     mock_client.get = AsyncMock(return_value=mock_resp)
     
-    # Create a mock async client context manager
-    mock_async_client = AsyncMock()
-    mock_async_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_async_client.__aexit__ = AsyncMock(return_value=None)
+    mock_client.is_closed = False
     
     # Replace the AsyncClient class with our mock
-    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_async_client)
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
     
     # Import after patching
     from src.api.client import fmp_api_request
@@ -78,13 +76,10 @@ async def test_fmp_api_request_http_error(monkeypatch):
     mock_client = AsyncMock()
     mock_client.get = AsyncMock(return_value=mock_resp)
     
-    # Create a mock async client context manager
-    mock_async_client = AsyncMock()
-    mock_async_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_async_client.__aexit__ = AsyncMock(return_value=None)
+    mock_client.is_closed = False
     
     # Replace the AsyncClient class with our mock
-    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_async_client)
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
     
     # Import after patching
     from src.api.client import fmp_api_request
@@ -110,13 +105,10 @@ async def test_fmp_api_request_request_error(monkeypatch):
     mock_client = AsyncMock()
     mock_client.get.side_effect = request_error
     
-    # Create a mock async client context manager
-    mock_async_client = AsyncMock()
-    mock_async_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_async_client.__aexit__ = AsyncMock(return_value=None)
+    mock_client.is_closed = False
     
     # Replace the AsyncClient class with our mock
-    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_async_client)
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
     
     # Import after patching
     from src.api.client import fmp_api_request
@@ -136,13 +128,10 @@ async def test_fmp_api_request_general_exception(monkeypatch):
     mock_client = AsyncMock()
     mock_client.get.side_effect = Exception("Unexpected error")
     
-    # Create a mock async client context manager
-    mock_async_client = AsyncMock()
-    mock_async_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_async_client.__aexit__ = AsyncMock(return_value=None)
+    mock_client.is_closed = False
     
     # Replace the AsyncClient class with our mock
-    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_async_client)
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
     
     # Import after patching
     from src.api.client import fmp_api_request
@@ -152,4 +141,461 @@ async def test_fmp_api_request_general_exception(monkeypatch):
     
     # Assertions to verify error handling
     assert "error" in response
-    assert response["error"] == "Unknown error"
\ No newline at end of file
+    assert response["error"] == "Unknown error"
+
+@pytest.mark.asyncio
+async def test_fmp_api_request_reuses_shared_client(mock_company_profile_response, monkeypatch):
+    """Test that consecutive requests share one pooled client until it is closed"""
+    # Create a mock response
+    mock_resp = AsyncMock()
+    mock_resp.content = json.dumps(mock_company_profile_response).encode()
+    mock_resp.raise_for_status = lambda: None
+    
+    # Mock the client's get and aclose methods
+    mock_client = AsyncMock()
+    mock_client.get = AsyncMock(return_value=mock_resp)
+    mock_client.is_closed = False
+    
+    # Count how many clients get created
+    created = []
+    
+    def make_client(**kwargs):
+        created.append(kwargs)
+        return mock_client
+    
+    monkeypatch.setattr('httpx.AsyncClient', make_client)
+    
+    # Import after patching
+    from src.api.client import fmp_api_request, close_client
+    
+    await fmp_api_request("profile", {"symbol": "AAPL"})
+    await fmp_api_request("quote", {"symbol": "AAPL"})
+    
+    # Both requests went through a single client
+    assert len(created) == 1
+    assert mock_client.get.call_count == 2
+    
+    # Closing releases the client and the next request creates a new one
+    await close_client()
+    assert mock_client.aclose.called
+    
+    await fmp_api_request("profile", {"symbol": "MSFT"})
+    assert len(created) == 2
+
+
+@pytest.mark.asyncio
+async def test_fmp_api_request_caches_quote_responses(mock_stock_quote_response, monkeypatch):
+    """Test that cacheable endpoints are served from the cache within their TTL"""
+    # Create a mock response
+    mock_resp = AsyncMock()
+    mock_resp.content = json.dumps(mock_stock_quote_response).encode()
+    mock_resp.raise_for_status = lambda: None
+    
+    # Mock the client's get method
+    mock_client = AsyncMock()
+    mock_client.get = AsyncMock(return_value=mock_resp)
+    mock_client.is_closed = False
+    
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
+    
+    # Import after patching
+    from src.api import client
+    
+    first = await client.fmp_api_request("quote", {"symbol": "AAPL"})
+    second = await client.fmp_api_request("quote", {"symbol": "AAPL"})
+    
+    # The second call is a cache hit
+    assert first == second == mock_stock_quote_response
+    assert mock_client.get.call_count == 1
+    
+    # A different symbol is a different cache entry
+    await client.fmp_api_request("quote", {"symbol": "MSFT"})
+    assert mock_client.get.call_count == 2
+    
+    # Expired entries are fetched again
+    monkeypatch.setitem(client.FMP_CACHE_TTLS, "quote", 0)
+    await client.fmp_api_request("quote", {"symbol": "TSLA"})
+    await client.fmp_api_request("quote", {"symbol": "TSLA"})
+    assert mock_client.get.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_fmp_api_request_does_not_cache_errors(monkeypatch):
+    """Test that error responses are not cached"""
+    # Create a mock HTTP error
+    http_error = httpx.HTTPStatusError(
+        "500 Server Error",
+        request=httpx.Request("GET", "https://example.com"),
+        response=httpx.Response(500)
+    )
+    
+    def raise_error():
+        raise http_error
+    
+    mock_resp = AsyncMock()
+    mock_resp.raise_for_status = raise_error
+    
+    # Mock the client's get method
+    mock_client = AsyncMock()
+    mock_client.get = AsyncMock(return_value=mock_resp)
+    mock_client.is_closed = False
+    
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
+    
+    # Import after patching
+    from src.api.client import fmp_api_request
+    
+    await fmp_api_request("quote", {"symbol": "AAPL"})
+    response = await fmp_api_request("quote", {"symbol": "AAPL"})
+    
+    assert response["error"] == "HTTP error: 500"
+    assert mock_client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_fmp_api_request_coalesces_concurrent_requests(mock_company_profile_response, monkeypatch):
+    """Test that identical concurrent requests share a single HTTP call"""
+    import asyncio
+    
+    # Create a mock response
+    mock_resp = AsyncMock()
+    mock_resp.content = json.dumps(mock_company_profile_response).encode()
+    mock_resp.raise_for_status = lambda: None
+    
+    # Make the request slow enough for the calls to overlap
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return mock_resp
+    
+    mock_client = AsyncMock()
+    mock_client.get = AsyncMock(side_effect=slow_get)
+    mock_client.is_closed = False
+    
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
+    
+    # Import after patching
+    from src.api import client
+    from src.api.client import fmp_api_request
+    
+    # Disable the response cache so only in-flight coalescing applies
+    monkeypatch.setattr(client, "FMP_CACHE_TTLS", {})
+    
+    results = await asyncio.gather(
+        *[fmp_api_request("profile", {"symbol": "AAPL"}) for _ in range(5)]
+    )
+    
+    assert all(result == mock_company_profile_response for result in results)
+    assert mock_client.get.call_count == 1
+    
+    # Once the first request completes, a new one goes to the network again
+    await fmp_api_request("profile", {"symbol": "AAPL"})
+    assert mock_client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_fmp_api_request_survives_cancelled_leader(mock_company_profile_response, monkeypatch):
+    """Test that cancelling the caller that started a request does not fail the callers sharing it"""
+    # Create a mock response
+    mock_resp = AsyncMock()
+    mock_resp.content = json.dumps(mock_company_profile_response).encode()
+    mock_resp.raise_for_status = lambda: None
+    
+    # Make the request slow enough for the calls to overlap
+    async def slow_get(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return mock_resp
+    
+    mock_client = AsyncMock()
+    mock_client.get = AsyncMock(side_effect=slow_get)
+    mock_client.is_closed = False
+    
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
+    
+    # Import after patching
+    from src.api import client
+    from src.api.client import fmp_api_request
+    
+    # Disable the response cache so only in-flight coalescing applies
+    monkeypatch.setattr(client, "FMP_CACHE_TTLS", {})
+    
+    leader = asyncio.ensure_future(fmp_api_request("profile", {"symbol": "AAPL"}))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(fmp_api_request("profile", {"symbol": "AAPL"}))
+    await asyncio.sleep(0)
+    leader.cancel()
+    
+    assert await waiter == mock_company_profile_response
+    assert leader.cancelled()
+    assert mock_client.get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_fmp_api_request_batches_concurrent_quotes(monkeypatch):
+    """Test that concurrent single-symbol quotes are fetched with one batch-quote call"""
+    import asyncio
+    
+    batch_data = [
+        {"symbol": "AAPL", "price": 190.5},
+        {"symbol": "MSFT", "price": 420.1},
+    ]
+    
+    # Answer the batch without TSLA, and single quotes with the requested symbol
+    async def get(url, params=None):
+        mock_resp = AsyncMock()
+        mock_resp.raise_for_status = lambda: None
+        if url.endswith("/batch-quote"):
+            mock_resp.content = json.dumps(batch_data).encode()
+        else:
+            mock_resp.content = json.dumps([{"symbol": params["symbol"]}]).encode()
+        return mock_resp
+    
+    mock_client = AsyncMock()
+    mock_client.get = AsyncMock(side_effect=get)
+    mock_client.is_closed = False
+    
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
+    
+    # Import after patching
+    from src.api.client import fmp_api_request
+    
+    aapl, msft, tsla = await asyncio.gather(
+        fmp_api_request("quote", {"symbol": "AAPL"}),
+        fmp_api_request("quote", {"symbol": "MSFT"}),
+        fmp_api_request("quote", {"symbol": "TSLA"}),
+    )
+    
+    assert aapl == [batch_data[0]]
+    assert msft == [batch_data[1]]
+    # A symbol the batch leaves out falls back to a single quote request
+    assert tsla == [{"symbol": "TSLA"}]
+    
+    assert mock_client.get.call_count == 2
+    url = mock_client.get.call_args_list[0][0][0]
+    params = mock_client.get.call_args_list[0][1]["params"]
+    assert url.endswith("/batch-quote")
+    assert params["symbols"] == "AAPL,MSFT,TSLA"
+    assert mock_client.get.call_args_list[1][0][0].endswith("/quote")
+
+
+@pytest.mark.asyncio
+async def test_batched_quote_survives_cancelled_leader(monkeypatch):
+    """Test that symbols joining a batch are fetched individually if the batch leader is cancelled"""
+    async def get(url, params=None):
+        mock_resp = AsyncMock()
+        mock_resp.raise_for_status = lambda: None
+        mock_resp.content = json.dumps([{"symbol": params["symbol"]}]).encode()
+        return mock_resp
+    
+    mock_client = AsyncMock()
+    mock_client.get = AsyncMock(side_effect=get)
+    mock_client.is_closed = False
+    
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
+    
+    # Import after patching
+    from src.api.client import _get_batched_quote
+    
+    leader = asyncio.ensure_future(_get_batched_quote("AAPL", "test_key"))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(_get_batched_quote("MSFT", "test_key"))
+    await asyncio.sleep(0)
+    leader.cancel()
+    
+    assert await asyncio.wait_for(waiter, timeout=1) == [{"symbol": "MSFT"}]
+    assert leader.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_fmp_api_request_batch_quote_falls_back_on_error(monkeypatch):
+    """Test that quotes are fetched individually when the batch request fails"""
+    import asyncio
+    
+    # Fail the batch request, answer single quotes with the requested symbol
+    async def get(url, params=None):
+        mock_resp = AsyncMock()
+        if url.endswith("/batch-quote"):
+            request = httpx.Request("GET", url)
+            response = httpx.Response(402, request=request)
+            mock_resp.raise_for_status = lambda: (_ for _ in ()).throw(
+                httpx.HTTPStatusError("Payment required", request=request, response=response)
+            )
+        else:
+            mock_resp.raise_for_status = lambda: None
+            mock_resp.content = json.dumps([{"symbol": params["symbol"]}]).encode()
+        return mock_resp
+    
+    mock_client = AsyncMock()
+    mock_client.get = AsyncMock(side_effect=get)
+    mock_client.is_closed = False
+    
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
+    
+    # Import after patching
+    from src.api.client import fmp_api_request
+    
+    aapl, msft = await asyncio.gather(
+        fmp_api_request("quote", {"symbol": "AAPL"}),
+        fmp_api_request("quote", {"symbol": "MSFT"}),
+    )
+    
+    assert aapl == [{"symbol": "AAPL"}]
+    assert msft == [{"symbol": "MSFT"}]
+    assert mock_client.get.call_count == 3
+    
+    # The refused batch is remembered: later quotes go straight to the quote endpoint
+    tsla, nvda = await asyncio.gather(
+        fmp_api_request("quote", {"symbol": "TSLA"}),
+        fmp_api_request("quote", {"symbol": "NVDA"}),
+    )
+    
+    assert tsla == [{"symbol": "TSLA"}]
+    assert nvda == [{"symbol": "NVDA"}]
+    assert mock_client.get.call_count == 5
+    assert not any(call[0][0].endswith("/batch-quote") for call in mock_client.get.call_args_list[3:])
+
+
+@pytest.mark.asyncio
+async def test_fmp_api_request_retries_rate_limited_requests(mock_company_profile_response, monkeypatch):
+    """Test that 429 responses are retried and the eventual success returned"""
+    request = httpx.Request("GET", "https://example.com")
+    rate_limited = httpx.Response(429, headers={"Retry-After": "0"}, request=request)
+    
+    def raise_rate_limited():
+        raise httpx.HTTPStatusError("429 Too Many Requests", request=request, response=rate_limited)
+    
+    limited_resp = AsyncMock()
+    limited_resp.raise_for_status = raise_rate_limited
+    
+    ok_resp = AsyncMock()
+    ok_resp.raise_for_status = lambda: None
+    ok_resp.content = json.dumps(mock_company_profile_response).encode()
+    
+    # Rate limited twice, then successful
+    mock_client = AsyncMock()
+    mock_client.get = AsyncMock(side_effect=[limited_resp, limited_resp, ok_resp])
+    mock_client.is_closed = False
+    
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
+    
+    # Import after patching
+    from src.api.client import fmp_api_request
+    
+    response = await fmp_api_request("profile", {"symbol": "AAPL"})
+    
+    assert response == mock_company_profile_response
+    assert mock_client.get.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_fmp_api_request_gives_up_after_max_retries(monkeypatch):
+    """Test that a persistently unavailable endpoint returns an error after the retries"""
+    request = httpx.Request("GET", "https://example.com")
+    unavailable = httpx.Response(503, headers={"Retry-After": "0"}, request=request)
+    
+    def raise_unavailable():
+        raise httpx.HTTPStatusError("503 Service Unavailable", request=request, response=unavailable)
+    
+    mock_resp = AsyncMock()
+    mock_resp.raise_for_status = raise_unavailable
+    
+    mock_client = AsyncMock()
+    mock_client.get = AsyncMock(return_value=mock_resp)
+    mock_client.is_closed = False
+    
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
+    
+    # Import after patching
+    from src.api import client
+    from src.api.client import fmp_api_request
+    
+    response = await fmp_api_request("profile", {"symbol": "AAPL"})
+    
+    assert response["error"] == "HTTP error: 503"
+    assert mock_client.get.call_count == client.FMP_MAX_RETRIES + 1
+
+
+@pytest.mark.asyncio
+async def test_fmp_api_request_revalidates_with_etag(mock_company_profile_response, monkeypatch):
+    """Test that an expired profile is revalidated and a 304 reuses the stored response"""
+    request = httpx.Request("GET", "https://example.com")
+    ok_resp = httpx.Response(200, json=mock_company_profile_response, headers={"ETag": '"v1"'}, request=request)
+    not_modified = httpx.Response(304, request=request)
+    
+    mock_client = AsyncMock()
+    mock_client.get = AsyncMock(side_effect=[ok_resp, not_modified])
+    mock_client.is_closed = False
+    
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
+    
+    # Import after patching
+    from src.api import client
+    from src.api.client import fmp_api_request
+    
+    first = await fmp_api_request("profile", {"symbol": "AAPL"})
+    client._cache.clear()  # Simulate TTL expiry
+    second = await fmp_api_request("profile", {"symbol": "AAPL"})
+    
+    assert first == mock_company_profile_response
+    assert second == mock_company_profile_response
+    assert "headers" not in mock_client.get.call_args_list[0][1]
+    assert mock_client.get.call_args_list[1][1]["headers"] == {"If-None-Match": '"v1"'}
+
+
+@pytest.mark.asyncio
+async def test_fmp_api_request_limits_concurrency(monkeypatch):
+    """Test that no more than FMP_MAX_CONCURRENCY requests are in flight at once"""
+    in_flight = 0
+    peak = 0
+    
+    async def mock_get(*args, **kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return MagicMock(raise_for_status=lambda: None, content=b'[{"ok": true}]')
+    
+    mock_client = AsyncMock()
+    mock_client.get = mock_get
+    mock_client.is_closed = False
+    
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
+    
+    # Import after patching
+    from src.api import client
+    from src.api.client import fmp_api_request
+    monkeypatch.setattr(client, "FMP_MAX_CONCURRENCY", 2)
+    
+    results = await asyncio.gather(
+        *(fmp_api_request("income-statement", {"symbol": f"SYM{i}"}) for i in range(6))
+    )
+    
+    assert all(result == [{"ok": True}] for result in results)
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_fmp_api_request_caches_empty_search_results(monkeypatch):
+    """Test that empty search results are cached, but empty results of other endpoints are not"""
+    mock_resp = AsyncMock()
+    mock_resp.content = b"[]"
+    mock_resp.raise_for_status = lambda: None
+    
+    mock_client = AsyncMock()
+    mock_client.get = AsyncMock(return_value=mock_resp)
+    mock_client.is_closed = False
+    
+    monkeypatch.setattr('httpx.AsyncClient', lambda **kwargs: mock_client)
+    
+    # Import after patching
+    from src.api.client import fmp_api_request
+    
+    # A mistyped symbol is only looked up once
+    assert await fmp_api_request("search-symbol", {"query": "APPL", "limit": 10}) == []
+    assert await fmp_api_request("search-symbol", {"query": "APPL", "limit": 10}) == []
+    assert mock_client.get.call_count == 1
+    
+    # Endpoints without a negative TTL are asked again
+    await fmp_api_request("quote", {"symbol": "APPL"})
+    await fmp_api_request("quote", {"symbol": "APPL"})
+    assert mock_client.get.call_count == 3
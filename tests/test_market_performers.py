@@ -17,7 +17,7 @@ async def test_get_biggest_gainers(mock_request, mock_biggest_gainers_response):
     result = await get_biggest_gainers(5)
     
     # Check API was called with correct parameters
-    mock_request.assert_called_once_with("biggest-gainers", {})
+    mock_request.assert_called_once_with("biggest-gainers", {"limit": 5})
     
     # Check the result contains expected information
     assert "# Top 5 Biggest Gainers" in result
@@ -39,7 +39,7 @@ async def test_get_biggest_losers(mock_request, mock_biggest_losers_response):
     result = await get_biggest_losers(5)
     
     # Check API was called with correct parameters
-    mock_request.assert_called_once_with("biggest-losers", {})
+    mock_request.assert_called_once_with("biggest-losers", {"limit": 5})
     
     # Check the result contains expected information
     assert "# Top 5 Biggest Losers" in result
@@ -61,7 +61,7 @@ async def test_get_most_active(mock_request, mock_most_active_response):
     result = await get_most_active(5)
     
     # Check API was called with correct parameters
-    mock_request.assert_called_once_with("most-actives", {})
+    mock_request.assert_called_once_with("most-actives", {"limit": 5})
     
     # Check the result contains expected information
     assert "# Top 5 Most Active Stocks" in result
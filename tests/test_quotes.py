@@ -225,4 +225,59 @@ async def test_get_aftermarket_quote_tool_empty_symbol():
     result = await get_aftermarket_quote(symbol="")
     
     # Assertions
-    assert "Error: Symbol parameter is required" in result
\ No newline at end of file
+    assert "Error: Symbol parameter is required" in result
+
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_get_multi_asset_quotes_tool(mock_request, mock_stock_quote_response):
+    """Test multi-asset quote tool fetching each asset class"""
+    async def quote_for_symbol(endpoint, params):
+        if params["symbol"] == "AAPL":
+            return mock_stock_quote_response
+        return [{"symbol": params["symbol"], "name": params["symbol"], "price": 1.0,
+                 "change": 0.0, "changesPercentage": 0.0}]
+    mock_request.side_effect = quote_for_symbol
+    
+    # Import after patching
+    from src.tools.quote import get_multi_asset_quotes
+    
+    # Execute the tool
+    result = await get_multi_asset_quotes({"stock": "AAPL", "index": "^GSPC", "crypto": "BTCUSD"})
+    
+    # Verify one quote request per asset
+    assert mock_request.call_count == 3
+    called_symbols = [call.args[1]["symbol"] for call in mock_request.call_args_list]
+    assert called_symbols == ["AAPL", "^GSPC", "BTCUSD"]
+    
+    # Assertions about the result, in the requested order
+    assert result.index("Apple Inc. (AAPL)") < result.index("^GSPC") < result.index("BTCUSD")
+
+
+@pytest.mark.asyncio
+async def test_get_multi_asset_quotes_tool_invalid_asset_class():
+    """Test multi-asset quote tool with unsupported asset class"""
+    from src.tools.quote import get_multi_asset_quotes
+    
+    result = await get_multi_asset_quotes({"bond": "US10Y"})
+    assert "Error: unsupported asset class(es): bond" in result
+    
+    result = await get_multi_asset_quotes({})
+    assert "Error: symbols parameter is required" in result
+
+
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_get_quote_tool_invalid_symbol(mock_request):
+    """Test quote tools reject malformed symbols without calling the API"""
+    from src.tools.quote import get_quote, get_quote_change, get_multi_asset_quotes
+    
+    result = await get_quote(symbol="AAPL!")
+    assert "Error: invalid symbol 'AAPL!'" in result
+    
+    result = await get_quote_change(symbol="not a symbol")
+    assert "Error: invalid symbol 'not a symbol'" in result
+    
+    result = await get_multi_asset_quotes({"stock": "AAPL", "crypto": "BTC/USD"})
+    assert "Error: invalid symbol(s): BTC/USD" in result
+    
+    mock_request.assert_not_called()
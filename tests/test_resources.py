@@ -25,12 +25,12 @@ async def test_stock_info_resource(mock_company_profile_response, mock_stock_quo
         # First response for profile
         (lambda: MagicMock(
             raise_for_status=lambda: None,
-            json=lambda: profile_data
+            content=json.dumps(profile_data).encode()
         )),
         # Second response for quotes
         (lambda: MagicMock(
             raise_for_status=lambda: None,
-            json=lambda: quote_data
+            content=json.dumps(quote_data).encode()
         ))
     ]
     
@@ -46,14 +46,10 @@ async def test_stock_info_resource(mock_company_profile_response, mock_stock_quo
     # Create a mock HTTP client
     mock_client = AsyncMock()
     mock_client.get = mock_get
+    mock_client.is_closed = False
     
-    # Create a mock context manager
-    mock_async_client = MagicMock()
-    mock_async_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_async_client.__aexit__ = AsyncMock(return_value=None)
-    
-    # Use the patch to replace the httpx.AsyncClient
-    with patch('httpx.AsyncClient', return_value=mock_async_client):
+    # Use the patch to replace the shared httpx.AsyncClient
+    with patch('httpx.AsyncClient', return_value=mock_client):
         # Import the module after patching
         from src.resources.company import get_stock_info_resource
         
@@ -1,6 +1,7 @@
 """
 Tests for search-related tools
 """
+import asyncio
 import pytest
 from unittest.mock import patch
 
@@ -178,6 +179,38 @@ async def test_search_by_symbol_missing_query():
     assert "Error: query parameter is required" in result
 
 
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_search_by_symbol_invalid_symbol(mock_request):
+    """Test search by symbol tool rejects malformed symbols without calling the API"""
+    from src.tools.search import search_by_symbol
+    
+    # Execute the tool with a malformed symbol
+    result = await search_by_symbol(query="AAPL; DROP")
+    
+    # Assertions
+    assert "Error: invalid symbol 'AAPL; DROP'" in result
+    mock_request.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_search_by_symbol_large_result(mock_request):
+    """Test that a large result page (formatted in a worker thread) is complete"""
+    mock_request.return_value = [
+        {"symbol": f"SYM{i}", "name": f"Company {i}", "currency": "USD", "exchange": "NYSE"}
+        for i in range(80)
+    ]
+    
+    from src.tools.search import search_by_symbol
+    
+    result = await search_by_symbol(query="SYM", limit=100)
+    
+    assert result.startswith("# Symbol Search Results for 'SYM'")
+    assert result.count("## SYM") == 80
+    assert "## SYM79 - Company 79" in result
+
+
 @pytest.mark.asyncio
 @patch('src.api.client.fmp_api_request')
 async def test_search_by_name(mock_request, mock_search_name_response):
@@ -293,4 +326,195 @@ async def test_search_by_name_missing_query():
     result = await search_by_name(query="")
     
     # Assertions
-    assert "Error: query parameter is required" in result
\ No newline at end of file
+    assert "Error: query parameter is required" in result
+
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_search(mock_request, mock_search_symbol_response, mock_search_name_response):
+    """Test GPT search action combining symbol and name results"""
+    # Set up the mock: symbol search first, then name search
+    mock_request.side_effect = [mock_search_symbol_response, mock_search_name_response]
+    
+    # Import after patching
+    from src.tools.search import search
+    
+    # Execute the tool
+    result = await search(query="AAPL")
+    
+    # Verify both searches were issued
+    assert mock_request.call_count == 2
+    mock_request.assert_any_call("search-symbol", {"query": "AAPL", "limit": 10})
+    mock_request.assert_any_call("search-name", {"query": "AAPL", "limit": 10})
+    
+    # Duplicate symbols across the two searches appear once, symbol matches first
+    ids = [item["id"] for item in result["results"]]
+    assert ids == ["stock-AAPL", "stock-AAPL.SW", "stock-AAPL.NE", "stock-APRU", "stock-APP"]
+
+
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_search_partial_failure(mock_request, mock_search_name_response):
+    """Test GPT search action when one of the searches fails"""
+    # Set up the mock: symbol search raises, name search succeeds
+    mock_request.side_effect = [RuntimeError("connection reset"), mock_search_name_response]
+    
+    # Import after patching
+    from src.tools.search import search
+    
+    # Execute the tool
+    result = await search(query="Apple")
+    
+    # Results from the successful search are still returned
+    ids = [item["id"] for item in result["results"]]
+    assert ids == ["stock-AAPL", "stock-APRU", "stock-APP"]
+
+
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_fetch_many(mock_request):
+    """Test fetching several resources at once"""
+    async def response_for(endpoint, params):
+        if endpoint == "profile":
+            return [{"companyName": f"{params['symbol']} Corp", "mktCap": 1000}]
+        return []
+    mock_request.side_effect = response_for
+    
+    # Import after patching
+    from src.tools.search import fetch_many
+    
+    # Execute the tool with a duplicate and an unknown resource ID
+    results = await fetch_many(["stock-AAPL", "stock-MSFT", "bond-X", "stock-AAPL"])
+    
+    # One result per ID, in order, with failures reported inline
+    assert [result["id"] for result in results] == ["stock-AAPL", "stock-MSFT", "bond-X", "stock-AAPL"]
+    assert results[0]["title"] == "AAPL Corp (AAPL)"
+    assert results[1]["title"] == "MSFT Corp (MSFT)"
+    assert "Unknown resource type" in results[2]["error"]
+    assert results[3] is results[0]
+    
+    # The duplicate ID is only fetched once
+    profile_calls = [call for call in mock_request.call_args_list if call.args[0] == "profile"]
+    assert len(profile_calls) == 2
+
+
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_fetch_concurrent_duplicates(mock_request):
+    """Test that concurrent fetches of the same ID share one fetch"""
+    async def response_for(endpoint, params):
+        await asyncio.sleep(0.01)
+        if endpoint == "profile":
+            return [{"companyName": "Apple Inc.", "mktCap": 1000}]
+        return []
+    mock_request.side_effect = response_for
+    
+    # Import after patching
+    from src.tools.search import fetch
+    
+    first, second = await asyncio.gather(fetch("stock-AAPL"), fetch("stock-AAPL"))
+    
+    assert first["title"] == "Apple Inc. (AAPL)"
+    assert second is first
+    profile_calls = [call for call in mock_request.call_args_list if call.args[0] == "profile"]
+    assert len(profile_calls) == 1
+
+
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_search_prefetches_top_result(mock_request, mock_search_symbol_response, capsys):
+    """Test that search starts fetching the top result in the background"""
+    async def response_for(endpoint, params):
+        if endpoint == "search-symbol":
+            return mock_search_symbol_response
+        if endpoint == "profile":
+            return [{"companyName": "Apple Inc.", "mktCap": 1000}]
+        return []
+    mock_request.side_effect = response_for
+    
+    # Import after patching
+    from src.tools.search import search, fetch, _fetch_tasks
+    
+    result = await search(query="AAPL")
+    
+    # Only the top result is prefetched, and fetch() joins that prefetch
+    assert list(_fetch_tasks) == ["stock-AAPL"]
+    prefetch = _fetch_tasks["stock-AAPL"]
+    fetched = await fetch(result["results"][0]["id"])
+    
+    assert fetched is prefetch.result()
+    assert fetched["title"] == "Apple Inc. (AAPL)"
+    profile_calls = [call for call in mock_request.call_args_list if call.args[0] == "profile"]
+    assert len(profile_calls) == 1
+    
+    # stdout carries the MCP protocol on the stdio transport; the prefetch must not write to it
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_fetch_invalid_id(mock_request):
+    """Test that malformed document IDs are rejected without any API calls"""
+    # Import after patching
+    from src.tools.search import fetch
+    
+    with pytest.raises(ValueError, match="Unknown resource type"):
+        await fetch("etf-SPY")
+    with pytest.raises(ValueError, match="Symbol is missing"):
+        await fetch("stock-")
+    
+    mock_request.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_fetch_unknown_symbol(mock_request):
+    """Test that an unknown symbol skips the detail endpoints"""
+    mock_request.return_value = []
+    
+    # Import after patching
+    from src.tools.search import fetch
+    
+    result = await fetch("stock-NOPE")
+    
+    assert result["title"] == "Unknown symbol NOPE"
+    assert result["metadata"] is None
+    assert sorted(call.args[0] for call in mock_request.call_args_list) == ["profile", "quote"]
+
+
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_fetch_api_error_is_not_unknown_symbol(mock_request):
+    """Test that failed profile and quote requests raise instead of reporting an unknown symbol"""
+    mock_request.return_value = {"error": "HTTP error: 429", "message": "Too Many Requests"}
+    
+    # Import after patching
+    from src.tools.search import fetch
+    
+    with pytest.raises(ValueError, match="Fetch failed: Too Many Requests"):
+        await fetch("stock-AAPL")
+    
+    assert sorted(call.args[0] for call in mock_request.call_args_list) == ["profile", "quote"]
+
+
+@pytest.mark.asyncio
+@patch('src.api.client.fmp_api_request')
+async def test_fetch_text_uses_real_newlines(mock_request):
+    """Test that fetch text sections are separated by newlines, not literal backslash-n"""
+    async def response_for(endpoint, params):
+        if endpoint == "profile":
+            return [{"companyName": "Apple Inc.", "mktCap": 1000}]
+        if endpoint == "quote":
+            return [{"price": 190.5, "volume": 2000, "avgVolume": 1000, "marketCap": 3000}]
+        if endpoint == "rsi":
+            return [{"rsi": 55.0}]
+        return []
+    mock_request.side_effect = response_for
+    
+    # Import after patching
+    from src.tools.search import fetch
+    
+    result = await fetch("stock-AAPL")
+    
+    assert "\\n" not in result["text"]
+    assert "\n\n=== TRADING ANALYSIS REQUIRED - USE THESE EXACT NUMBERS ===\n" in result["text"]
+    assert "\n\n=== TECHNICAL INDICATORS - CITE THESE EXACT VALUES ===\n" in result["text"]
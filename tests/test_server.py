@@ -42,10 +42,12 @@ async def test_tool_registration():
         "get_quote",
         "get_quote_change",
         "get_aftermarket_quote",
+        "get_multi_asset_quotes",
         "get_price_change", 
         "get_income_statement",
         "search_by_symbol",
         "search_by_name",
+        "fetch_many",
         "get_ratings_snapshot",
         "get_financial_estimates",
         "get_price_target_news",
@@ -166,18 +168,14 @@ async def test_tool_execution(mock_company_profile_response):
     # Mock the httpx client at a lower level to avoid API client issues
     mock_response = MagicMock()
     mock_response.raise_for_status = lambda: None
-    mock_response.json = lambda: profile_data
+    mock_response.content = json.dumps(profile_data).encode()
     
     mock_client = AsyncMock()
     mock_client.get = AsyncMock(return_value=mock_response)
+    mock_client.is_closed = False
     
-    # When creating a client context manager, return our mock
-    mock_async_client = MagicMock()
-    mock_async_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_async_client.__aexit__ = AsyncMock(return_value=None)
-    
-    # Use the patch to replace the httpx.AsyncClient with our mock
-    with patch('httpx.AsyncClient', return_value=mock_async_client):
+    # Use the patch to replace the shared httpx.AsyncClient with our mock
+    with patch('httpx.AsyncClient', return_value=mock_client):
         # Import the server module (after mock is in place)
         from src.server import mcp
         
@@ -220,12 +218,12 @@ async def test_resource_handling(mock_company_profile_response, mock_stock_quote
         # First response for profile
         (lambda: MagicMock(
             raise_for_status=lambda: None,
-            json=lambda: profile_data
+            content=json.dumps(profile_data).encode()
         )),
         # Second response for quotes
         (lambda: MagicMock(
             raise_for_status=lambda: None,
-            json=lambda: quote_data
+            content=json.dumps(quote_data).encode()
         ))
     ]
     
@@ -241,14 +239,10 @@ async def test_resource_handling(mock_company_profile_response, mock_stock_quote
     # Create a mock HTTP client
     mock_client = AsyncMock()
     mock_client.get = mock_get
+    mock_client.is_closed = False
     
-    # Create a mock context manager
-    mock_async_client = MagicMock()
-    mock_async_client.__aenter__ = AsyncMock(return_value=mock_client)
-    mock_async_client.__aexit__ = AsyncMock(return_value=None)
-    
-    # Use the patch to replace the httpx.AsyncClient
-    with patch('httpx.AsyncClient', return_value=mock_async_client):
+    # Use the patch to replace the shared httpx.AsyncClient
+    with patch('httpx.AsyncClient', return_value=mock_client):
         # Import the server module (after mock is in place)
         from src.server import mcp
         
@@ -148,3 +148,43 @@ async def test_get_income_statement_invalid_limit():
     # Execute with invalid limit (too high)
     result = await get_income_statement(symbol="AAPL", limit=121)
     assert "Error: limit must be between 1 and 120" in result
+
+
+def test_direction_emoji():
+    """Test the change direction emoji helper"""
+    from src.tools.statements import direction_emoji
+    
+    assert direction_emoji(1.5) == "🔺"
+    assert direction_emoji(-0.25) == "🔻"
+    assert direction_emoji(0) == "➖"
+
+
+def test_format_number():
+    """Test number formatting for numbers, strings and other values"""
+    from src.tools.statements import format_number
+    
+    assert format_number(1234567) == "1,234,567"
+    assert format_number(1234.5) == "1,234.5"
+    assert format_number(True) == "1"
+    assert format_number("N/A") == "N/A"
+    assert format_number(None) == "None"
+    assert format_number([1, 2]) == "[1, 2]"
+    
+    # Equal values that format differently must not share a cached result
+    assert format_number(0.0) == "0.0"
+    assert format_number(-0.0) == "-0.0"
+    assert format_number(1) == "1"
+    assert format_number(1.0) == "1.0"
+
+
+def test_response_error():
+    """Test the shared API response check, with and without a symbol"""
+    from src.tools.statements import response_error
+    
+    error = {"error": "HTTP error: 500", "message": "Server error"}
+    
+    assert response_error([{"symbol": "AAPL"}], "quote", "AAPL") is None
+    assert response_error(error, "quote", "AAPL") == "Error fetching quote for AAPL: Server error"
+    assert response_error([], "quote", "AAPL") == "No quote data found for symbol AAPL"
+    assert response_error(error, "biggest gainers") == "Error fetching biggest gainers: Server error"
+    assert response_error([], "biggest gainers") == "No data found for biggest gainers"